@@ -5,17 +5,38 @@ import platform
 import subprocess
 import hashlib
 import shutil
-import math
 import json
+import copy
+import io
+import threading
+import time
 import numpy as np
-from functools import partial
-from collections import defaultdict
+from functools import partial, lru_cache
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Library Pihak Ketiga (wajib install) ---
-from PIL import Image
+from PIL import Image, ImageOps, UnidentifiedImageError
 from PIL.ExifTags import TAGS
 from send2trash import send2trash
 
+# --- Library Opsional (lebih cepat jika tersedia) ---
+try:
+    import orjson
+    def json_loads(data): return orjson.loads(data)
+    def json_dumps(obj): return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    orjson = None
+    def json_loads(data): return json.loads(data)
+    def json_dumps(obj): return json.dumps(obj, indent=2).encode('utf-8') # Indentasi sama dengan OPT_INDENT_2
+
+try:
+    # Cache kompilasi Numba di folder cache aplikasi, bukan di sebelah skrip (folder instalasi bisa read-only)
+    os.environ.setdefault('NUMBA_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'MacanGallery', 'numba'))
+    from numba import njit, prange
+except ImportError:
+    njit = prange = None
+
 # --- Core PySide6 Libraries ---
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QScrollArea,
@@ -26,26 +47,49 @@ from PySide6.QtWidgets import (
     QTextEdit, QDockWidget, QCheckBox
 )
 from PySide6.QtGui import (
-    QPixmap, QImage, QAction, QIcon, QKeySequence, QPainter, QCursor, QTransform,
+    QPixmap, QPixmapCache, QImage, QAction, QIcon, QKeySequence, QPainter, QCursor, QTransform,
     QColor, QMouseEvent, QDrag, QActionGroup, QFont
 )
 from PySide6.QtCore import (
     Qt, QSize, QPoint, QRect, QByteArray, QThread, QObject, Signal,
-    QSettings, QTimer, QMimeData, QUrl, QEvent
+    QSettings, QTimer, QMimeData, QUrl, QEvent, QRunnable, QThreadPool
 )
 from PySide6.QtSvg import QSvgRenderer
 
 if platform.system() == "Windows":
     import ctypes
+    # Diikat sekali dengan tipe argumen eksplisit (path selalu dikirim sebagai wchar_t*)
+    _SystemParametersInfoW = ctypes.WinDLL("user32", use_last_error=True).SystemParametersInfoW
+    _SystemParametersInfoW.argtypes = [ctypes.c_uint, ctypes.c_uint, ctypes.c_wchar_p, ctypes.c_uint]
+    _SystemParametersInfoW.restype = ctypes.c_int
 
 # --- Constants ---
 APP_NAME = "Macan Gallery Pro"
 ORGANIZATION_NAME = "DanxExodus"
 APP_VERSION = "3.2.0" 
-THUMBNAIL_IMAGE_SIZE = QSize(220, 124) 
+THUMBNAIL_IMAGE_SIZE = QSize(210, 118) # Sama persis dengan label thumbnail, tidak perlu di-scale lagi
 CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'MacanGallery', 'thumbnails')
-SUPPORTED_IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.webp']
+SUPPORTED_IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.bmp', '.webp'})
 METADATA_SUFFIX = ".meta.json"
+WALLPAPER_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'MacanGallery', 'wallpapers') # Terpisah dari cache thumbnail: Clear Cache tidak boleh menghapus wallpaper aktif
+LABEL_COLORS = (("No Label", "none"), ("Red", "red"), ("Yellow", "yellow"), ("Green", "green"), ("Blue", "blue"))
+LABEL_COLOR_HEX = {"red": "#D16969", "yellow": "#EBCB8B", "green": "#A3BE8C", "blue": "#007ACC"}
+EXIF_DISPLAY_TAGS = ('Model', 'Make', 'DateTimeOriginal', 'ExposureTime', 'FNumber', 'ISOSpeedRatings', 'FocalLength', 'LensModel')
+ZOOM_CACHE_MAX_ENTRIES = 6
+EXIF_CACHE_MAX_ENTRIES = 128
+METADATA_CACHE_MAX_ENTRIES = 4096
+METADATA_WRITE_MAX_ATTEMPTS = 3 # Update antre yang terus gagal ditulis (mis. media read-only) dibuang setelah sekian flush
+ZOOM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+DECODED_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PREFETCH_NEIGHBORS = (1, -1) # Gambar berikut/sebelumnya yang di-decode lebih awal di viewer
+READAHEAD_NEIGHBORS = (2, -2) # Satu langkah lebih jauh: hanya dihangatkan di page cache OS, tanpa decode
+EDIT_RESULT_CACHE_MAX_BYTES = 96 * 1024 * 1024
+PIXMAP_CACHE_LIMIT_KB = 200 * 1024
+GRID_ROW_HEIGHT = 195 # Tinggi tile (180) + spacing grid (15)
+GRID_PREFETCH_ROWS = 4 # Baris tambahan di atas/bawah viewport yang tetap punya widget
+GRID_POOL_MAX = 128 # Widget grid cadangan per jenis; kelebihannya dihapus
+GRID_INSERT_BATCH = 32 # Widget per giliran event loop saat mengisi grid
+CLOSE_WAIT_TIMEOUT_MS = 2000 # Batas menunggu worker thumbnail saat aplikasi ditutup
 
 # --- Helper Functions ---
 def get_human_readable_size(size_in_bytes):
@@ -53,101 +97,634 @@ def get_human_readable_size(size_in_bytes):
     if size_in_bytes is None or size_in_bytes == 0:
         return "0 B"
     size_name = ("B", "KB", "MB", "GB", "TB")
-    i = int(math.floor(math.log(size_in_bytes, 1024)))
-    p = math.pow(1024, i)
-    s = round(size_in_bytes / p, 2)
+    i = min((int(size_in_bytes).bit_length() - 1) // 10, len(size_name) - 1) # floor(log1024) tanpa floating point
+    s = round(size_in_bytes / (1 << (10 * i)), 2)
     return f"{s} {size_name[i]}"
 
+def get_directory_usage(root):
+    """Total ukuran dan jumlah file di bawah root (rekursif). Satu os.scandir per folder; ukuran diambil
+    dari entry.stat() yang di Windows sudah tersedia dari listing direktori."""
+    total_size, file_count, stack = 0, 0, [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False): stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total_size += entry.stat(follow_symlinks=False).st_size; file_count += 1
+    return total_size, file_count
+
+def list_cached_files():
+    """Set path semua file di cache thumbnail (satu scandir per shard), untuk cek keberadaan tanpa stat per file."""
+    cached = set()
+    try:
+        with os.scandir(CACHE_DIR) as it: shards = [e.path for e in it if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return cached
+    for shard in shards:
+        try:
+            with os.scandir(shard) as it: cached.update(e.path for e in it)
+        except OSError: pass
+    return cached
+
+def measure_cache_usage():
+    """(total ukuran, jumlah file) cache thumbnail.
+    Subfolder shard dihitung paralel agar stat() yang lambat (disk jaringan) saling tumpang tindih."""
+    total_size, file_count, shards = 0, 0, []
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False): shards.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                total_size += entry.stat(follow_symlinks=False).st_size; file_count += 1
+    if len(shards) < 8: # Cache kecil: overhead pool tidak sepadan
+        results = [get_directory_usage(path) for path in shards]
+    else:
+        with ThreadPoolExecutor(max_workers=4) as ex: results = list(ex.map(get_directory_usage, shards))
+    for size, count in results: total_size += size; file_count += count
+    return total_size, file_count
+
+@lru_cache(maxsize=32)
+def get_brightness_contrast_lut(brightness, contrast_percent):
+    """Membuat tabel LUT 256 entri untuk brightness/contrast (di-cache per nilai slider)."""
+    lut = np.arange(256, dtype=np.float32) * (contrast_percent / 100.0) + brightness
+    return np.clip(lut, 0, 255).astype(np.uint8)
+
+# Bobot luma (Rec. 601) dalam urutan BGR, dipakai untuk saturasi
+LUMA_WEIGHTS_BGR = (0.114, 0.587, 0.299)
+
+@lru_cache(maxsize=32)
+def get_saturation_matrix(saturation_percent):
+    """Matriks 3x3 untuk cv2.transform: out = gray + s * (bgr - gray), gray = luma. Tanpa konversi HSV."""
+    s = saturation_percent / 100.0
+    return s * np.eye(3, dtype=np.float32) + (1.0 - s) * np.tile(np.array(LUMA_WEIGHTS_BGR, dtype=np.float32), (3, 1))
+
+if njit is not None:
+    # Tanpa signature: tidak dikompilasi saat modul diimpor. Hanya dipanggil dari _edit_pool (satu thread; threading
+    # layer Numba tidak boleh dipakai bersamaan) dan dipanaskan di sana saat start lewat warm_up_edits_kernel.
+    @njit(parallel=True, fastmath=True, nogil=True, cache=True)
+    def _apply_edits_kernel(img, bc_lut, saturation, out):
+        """Brightness/contrast (LUT) lalu saturasi dalam satu lintasan BGR; rumus sama dengan get_saturation_matrix."""
+        h, w = img.shape[0], img.shape[1]
+        wb, wg, wr = np.float32(LUMA_WEIGHTS_BGR[0]), np.float32(LUMA_WEIGHTS_BGR[1]), np.float32(LUMA_WEIGHTS_BGR[2])
+        for y in prange(h):
+            for x in range(w):
+                b, g, r = np.float32(bc_lut[img[y, x, 0]]), np.float32(bc_lut[img[y, x, 1]]), np.float32(bc_lut[img[y, x, 2]])
+                gray = wb * b + wg * g + wr * r
+                out[y, x, 0] = np.uint8(min(max(gray + saturation * (b - gray), 0.0), 255.0) + 0.5)
+                out[y, x, 1] = np.uint8(min(max(gray + saturation * (g - gray), 0.0), 255.0) + 0.5)
+                out[y, x, 2] = np.uint8(min(max(gray + saturation * (r - gray), 0.0), 255.0) + 0.5)
+
+    def warm_up_edits_kernel():
+        """Memicu kompilasi (atau muat dari NUMBA_CACHE_DIR) dengan array kecil, bertipe sama dengan pemanggilan asli."""
+        _apply_edits_kernel(np.zeros((1, 1, 3), np.uint8), get_brightness_contrast_lut(0, 100).ravel(), np.float32(1.0), np.empty((1, 1, 3), np.uint8))
+else:
+    _apply_edits_kernel = warm_up_edits_kernel = None
+
+def bgr_to_qimage(cv_image):
+    """Membungkus array BGR uint8 sebagai QImage tanpa salinan (stride diambil dari array, piksel per baris harus rapat).
+    Array harus tetap hidup selama QImage dipakai."""
+    h, w = cv_image.shape[:2]
+    return QImage(cv_image.data, w, h, cv_image.strides[0], QImage.Format.Format_BGR888)
+
+def get_scratch_buffer(scratch, name, shape):
+    """Buffer uint8 untuk tahap antara, dipakai ulang antar panggilan (dialokasi ulang hanya jika ukuran berubah).
+    scratch=None berarti selalu alokasi baru; dict scratch hanya boleh dipakai oleh satu thread sekaligus."""
+    if scratch is None: return np.empty(shape, dtype=np.uint8)
+    buf = scratch.get(name)
+    if buf is None or buf.shape != shape:
+        buf = scratch[name] = np.empty(shape, dtype=np.uint8)
+    return buf
+
 # --- Metadata (Rating/Label) Management ---
 def get_metadata_path(image_path):
     """Mendapatkan path file metadata untuk sebuah gambar."""
     return image_path + METADATA_SUFFIX
 
+# Cache hasil parse .json: meta_path -> ((mtime_ns, size), metadata). Disegarkan otomatis jika file berubah.
+_metadata_cache = OrderedDict()
+
+def _remember_metadata(meta_path, st, metadata):
+    _metadata_cache[meta_path] = ((st.st_mtime_ns, st.st_size), copy.deepcopy(metadata))
+    _metadata_cache.move_to_end(meta_path)
+    while len(_metadata_cache) > METADATA_CACHE_MAX_ENTRIES: _metadata_cache.popitem(last=False)
+
+# Update yang belum ditulis ke disk: image_path -> {key: value} (None = hapus key). Lihat queue_metadata_write.
+_pending_metadata = {}
+_pending_metadata_failures = {} # image_path -> berapa kali flush gagal menulisnya
+
 def read_metadata(image_path):
-    """Membaca metadata dari file .json."""
+    """Membaca metadata dari file .json, termasuk update yang masih antre."""
+    metadata = _read_metadata_file(image_path)
+    pending = _pending_metadata.get(image_path)
+    if pending:
+        for key, value in pending.items():
+            if value is None: metadata.pop(key, None)
+            else: metadata[key] = copy.deepcopy(value)
+    return metadata
+
+def _read_metadata_file(image_path):
     meta_path = get_metadata_path(image_path)
-    if os.path.exists(meta_path):
+    try:
+        st = os.stat(meta_path)
+    except OSError:
+        _metadata_cache.pop(meta_path, None)
+        return {}
+    cached = _metadata_cache.get(meta_path)
+    if cached is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+        _metadata_cache.move_to_end(meta_path)
+        return copy.deepcopy(cached[1]) # Pemanggil boleh mengubah dict yang dikembalikan
+    try:
+        with open(meta_path, 'rb') as f:
+            metadata = json_loads(f.read())
+    except (ValueError, OSError): # json/orjson.JSONDecodeError, UTF-8 rusak, atau file hilang di tengah jalan
+        return {}
+    _remember_metadata(meta_path, st, metadata)
+    return metadata
+
+def write_file_atomic(path, payload):
+    """Menulis bytes ke file sementara lalu os.replace, sehingga file tidak pernah setengah tertulis."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp" # Unik per thread: beberapa worker bisa menulis target yang sama
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
         try:
-            with open(meta_path, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
+            view = memoryview(payload)
+            while view: view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try: os.remove(tmp_path) # Jangan tinggalkan .tmp, gagal di write maupun di replace
+        except OSError: pass
+        raise
 
 def write_metadata(image_path, data):
     """Menulis atau memperbarui metadata ke file .json."""
-    meta_path = get_metadata_path(image_path)
-    existing_data = read_metadata(image_path)
-    existing_data.update(data)
-    with open(meta_path, 'w') as f:
-        json.dump(existing_data, f, indent=4)
+    batch_write_metadata({image_path: data})
+
+def batch_write_metadata(updates, failures=None):
+    """
+    Menulis update metadata untuk banyak gambar sekaligus: {image_path: {key: value}}.
+    Setiap file .json hanya dibaca dan ditulis sekali. Nilai None menghapus key tersebut.
+    Mengembalikan metadata hasil akhir per gambar. Satu file yang gagal tidak menghentikan yang lain:
+    jika failures (dict) diberikan, error dicatat di sana per path; jika tidak, error pertama di-raise di akhir.
+    """
+    written, errors = {}, {}
+    for image_path, data in updates.items():
+        try:
+            metadata = read_metadata(image_path)
+            for key, value in data.items():
+                if value is None: metadata.pop(key, None)
+                else: metadata[key] = value
+            meta_path = get_metadata_path(image_path)
+            write_file_atomic(meta_path, json_dumps(metadata))
+            _remember_metadata(meta_path, os.stat(meta_path), metadata)
+        except OSError as e:
+            errors[image_path] = e
+            continue
+        _pending_metadata.pop(image_path, None) # Sudah ikut tertulis lewat read_metadata di atas
+        written[image_path] = metadata
+    if failures is not None: failures.update(errors)
+    elif errors: raise next(iter(errors.values()))
+    return written
+
+def queue_metadata_write(image_path, data):
+    """Seperti write_metadata, tetapi hanya dicatat; ditulis oleh flush_metadata_writes. read_metadata langsung melihatnya."""
+    _pending_metadata.setdefault(image_path, {}).update(copy.deepcopy(data))
+
+def flush_metadata_writes(image_paths=None):
+    """Menulis update yang antre (semua, atau hanya untuk image_paths) dengan satu tulis per file.
+    Tidak raise: mengembalikan {image_path: error} untuk yang gagal. Update untuk gambar yang sudah tidak ada,
+    atau yang gagal METADATA_WRITE_MAX_ATTEMPTS kali, dibuang agar tidak menahan antrean selamanya."""
+    paths = list(_pending_metadata) if image_paths is None else [p for p in image_paths if p in _pending_metadata]
+    failures = {}
+    if not paths: return failures
+    written = batch_write_metadata({p: {} for p in paths}, failures)
+    for path in written: _pending_metadata_failures.pop(path, None)
+    for path in failures:
+        attempts = _pending_metadata_failures[path] = _pending_metadata_failures.get(path, 0) + 1
+        if attempts >= METADATA_WRITE_MAX_ATTEMPTS or not os.path.exists(path):
+            _pending_metadata.pop(path, None), _pending_metadata_failures.pop(path, None)
+    return failures
+
+def describe_metadata_failures(failures):
+    """Ringkasan satu baris untuk status bar dari hasil flush_metadata_writes."""
+    return f"failed to save metadata for {len(failures)} image(s): {next(iter(failures.values()))}"
+
+def move_file(source_path, dest_path):
+    """Rename langsung jika satu volume; jika gagal (mis. beda drive) kembali ke shutil.move."""
+    try: os.replace(source_path, dest_path)
+    except OSError: shutil.move(source_path, dest_path)
+
+def move_image_with_metadata(source_path, dest_path):
+    """Memindahkan gambar beserta file metadata-nya (bila ada). Aman dijalankan di thread background."""
+    if os.path.exists(dest_path): raise FileExistsError(f"'{os.path.basename(dest_path)}' already exists in the destination folder") # os.replace akan menimpa diam-diam
+    move_file(source_path, dest_path)
+    meta_source = get_metadata_path(source_path)
+    if os.path.exists(meta_source):
+        move_file(meta_source, get_metadata_path(dest_path))
+    return dest_path
+
+def apply_wallpaper(path):
+    """Menjadikan gambar sebagai wallpaper desktop (blocking; jalankan lewat BackgroundTask)."""
+    system = platform.system()
+    if system == "Windows":
+        if not _SystemParametersInfoW(20, 0, path, 3): raise ctypes.WinError(ctypes.get_last_error()) # SPI_SETDESKWALLPAPER
+    elif system == "Darwin":
+        posix_path = path.replace('\\', '\\\\').replace('"', '\\"') # Escape string AppleScript
+        subprocess.run(["osascript", "-e", f'tell application "Finder" to set desktop picture to POSIX file "{posix_path}"'], check=True) # Tanpa shell
+    else:
+        uri = f"file://{path}"
+        try: from gi.repository import Gio # Diimpor di sini saja: memuat typelib GI memperlambat startup
+        except (ImportError, ValueError): Gio = None
+        source = Gio.SettingsSchemaSource.get_default() if Gio is not None else None
+        # Settings.new() membatalkan proses jika schema tidak terpasang, jadi cek dulu
+        if source is not None and source.lookup("org.gnome.desktop.background", True) is not None:
+            settings = Gio.Settings.new("org.gnome.desktop.background")
+            if not settings.set_string("picture-uri", uri): raise OSError("Could not set GNOME wallpaper")
+            Gio.Settings.sync()
+        else: subprocess.run(["gsettings", "set", "org.gnome.desktop.background", "picture-uri", uri], check=True)
+
+def prepare_wallpaper(path, screen_w, screen_h):
+    """Salinan gambar yang sudah diperkecil ke resolusi layar (disimpan di WALLPAPER_CACHE_DIR), agar OS tidak
+    men-decode dan me-resize foto besar setiap kali desktop digambar ulang. Gambar yang tidak lebih besar dari layar dipakai apa adanya."""
+    st = os.stat(path)
+    key = hashlib.blake2b(f"{path}|{st.st_mtime_ns}|{st.st_size}".encode(), digest_size=8).hexdigest()
+    cached_path = os.path.join(WALLPAPER_CACHE_DIR, f"{key}_{screen_w}x{screen_h}.png")
+    if os.path.exists(cached_path): return cached_path
+    with Image.open(path) as im:
+        im = ImageOps.exif_transpose(im) # Orientasi diterapkan, karena EXIF tidak ikut tersimpan di PNG
+        scale = max(screen_w / im.width, screen_h / im.height) # Menutupi layar penuh (mode fill/zoom)
+        if scale >= 1.0: return path
+        im = im.resize((max(1, round(im.width * scale)), max(1, round(im.height * scale))), Image.LANCZOS)
+        if im.mode not in ("RGB", "RGBA"): # Mis. JPEG CMYK tidak bisa disimpan sebagai PNG
+            im = im.convert("RGBA" if "A" in im.getbands() or "transparency" in im.info else "RGB")
+        buffer = io.BytesIO()
+        im.save(buffer, "PNG")
+    os.makedirs(WALLPAPER_CACHE_DIR, exist_ok=True)
+    write_file_atomic(cached_path, buffer.getvalue())
+    return cached_path
+
+def set_wallpaper(path, screen_w, screen_h):
+    wallpaper_path = prepare_wallpaper(path, screen_w, screen_h)
+    apply_wallpaper(wallpaper_path)
+    # Nama file tetap per gambar (path sama tidak memicu desktop memuat ulang), jadi salinan lama dihapus di sini
+    try:
+        with os.scandir(WALLPAPER_CACHE_DIR) as it: stale = [entry.path for entry in it if entry.path != wallpaper_path]
+    except OSError: return
+    for stale_path in stale:
+        try: os.remove(stale_path)
+        except OSError: pass
+
+_SNAPSHOT_SETTLE_NS = 2_000_000_000 # Resolusi mtime FAT/exFAT 2 detik: folder yang baru berubah belum boleh dipercaya
+
+def _scan_directory(dirpath, snapshots, now_ns):
+    """(nama gambar, subfolder) dalam satu folder. Jika mtime folder sama dengan snapshot terakhir
+    (tidak ada file ditambah/dihapus/diganti nama), isi folder tidak dibaca ulang."""
+    mtime_ns = os.stat(dirpath).st_mtime_ns
+    cached = snapshots.get(dirpath)
+    if cached is not None and cached[0] == mtime_ns: return cached[1], cached[2]
+    names, subdirs = [], []
+    with os.scandir(dirpath) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    if not entry.is_symlink(): subdirs.append(entry.path) # Seperti os.walk: symlink folder tidak ditelusuri
+                    continue
+            except OSError: continue
+            dot = entry.name.rfind('.')
+            if dot > 0 and entry.name[dot:].lower() in SUPPORTED_IMAGE_EXTENSIONS: names.append(entry.name) # Sama dengan splitext: ".png" saja bukan ekstensi
+    names.sort()
+    if now_ns - mtime_ns > _SNAPSHOT_SETTLE_NS: snapshots[dirpath] = (mtime_ns, names, subdirs)
+    return names, subdirs
+
+def scan_image_folders(folders, snapshots=None):
+    """Menelusuri folder galeri dan mengelompokkan gambar per folder. Mengembalikan
+    (grouped_images, image_names, all_image_paths); aman dijalankan di thread background.
+    snapshots (dict folder -> (mtime_ns, nama gambar, subfolder)) dipakai ulang dan diperbarui antar scan."""
+    if snapshots is None: snapshots = {}
+    grouped_images, image_names, all_image_paths = {}, {}, []
+    now_ns = time.time_ns()
+    for base_folder in folders:
+        try:
+            stack = [base_folder]
+            while stack:
+                dirpath = stack.pop()
+                try: names, subdirs = _scan_directory(dirpath, snapshots, now_ns)
+                except OSError: continue # Seperti os.walk: folder yang tidak bisa dibaca dilewati
+                stack.extend(reversed(subdirs)) # Urutan top-down sama dengan os.walk
+                if names:
+                    images_in_current_folder = [os.path.join(dirpath, name) for name in names]
+                    image_names.update(zip(images_in_current_folder, names))
+                    grouped_images[dirpath] = images_in_current_folder
+                    all_image_paths.extend(images_in_current_folder)
+        except Exception as e: print(f"Could not scan folder {base_folder}: {e}")
+    return grouped_images, image_names, all_image_paths
+
+def filter_existing_paths(paths):
+    """Mengembalikan subset path yang ada di disk, dengan satu os.scandir per folder (bukan stat per file)."""
+    paths_by_dir = defaultdict(list)
+    for path in paths:
+        paths_by_dir[os.path.dirname(path)].append(path)
+    existing = set()
+    for folder, folder_paths in paths_by_dir.items():
+        try:
+            with os.scandir(folder or os.curdir) as it:
+                names = {entry.name for entry in it}
+        except OSError:
+            continue
+        existing.update(p for p in folder_paths if os.path.basename(p) in names)
+    return existing
+
+def move_images_to_trash(image_paths):
+    """Memindahkan gambar (beserta file metadata-nya) ke Trash. Mengembalikan daftar gambar yang berhasil."""
+    meta_paths = {p: get_metadata_path(p) for p in image_paths}
+    existing = filter_existing_paths(list(image_paths) + list(meta_paths.values()))
+    if platform.system() == "Windows":
+        # Satu panggilan untuk semua item: send2trash memproses list dalam satu operasi shell
+        trash_items = [os.path.normpath(p) for p in image_paths if p in existing]
+        trash_items += [os.path.normpath(m) for m in meta_paths.values() if m in existing]
+        try:
+            if trash_items: send2trash(trash_items)
+            return list(image_paths)
+        except Exception as e:
+            print(f"Batch delete failed, falling back to per-file delete: {e}")
+            existing = filter_existing_paths(existing) # Sebagian mungkin sudah terhapus
+    # Tanpa API batch dari OS, hapus satu per satu: send2trash memilih nama di Trash dengan cek-lalu-rename,
+    # jadi dua file bernama sama yang dibuang bersamaan bisa saling menimpa
+    deleted_paths = []
+    for path in image_paths:
+        try:
+            _move_image_to_trash(path, path in existing, meta_paths[path] in existing)
+            deleted_paths.append(path)
+        except Exception as e:
+            print(f"Failed to delete {path}: {e}")
+    return deleted_paths
+
+def _move_image_to_trash(path, image_exists, meta_exists):
+    if image_exists:
+        send2trash(os.path.normpath(path))
+    if meta_exists:
+        send2trash(os.path.normpath(get_metadata_path(path)))
+
+def get_thumbnail_cache_path(image_path):
+    """Path file cache thumbnail. Kunci memuat mtime/ukuran file dan ukuran thumbnail, jadi gambar yang
+    diubah (mis. rotate) otomatis dibuat ulang; disimpan dua tingkat folder agar isi tiap folder tetap kecil."""
+    try:
+        st = os.stat(image_path)
+        return _thumbnail_cache_path_for(image_path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return _thumbnail_cache_path_for(image_path, None, None)
+
+@lru_cache(maxsize=65536)
+def _thumbnail_cache_path_for(image_path, mtime_ns, size):
+    """Hash kunci cache di-memo per (path, mtime, ukuran); rebuild grid cukup os.stat tanpa hashing ulang."""
+    signature = "" if mtime_ns is None else f"{mtime_ns}|{size}"
+    key = hashlib.blake2b(f"{image_path}|{signature}|{THUMBNAIL_IMAGE_SIZE.width()}x{THUMBNAIL_IMAGE_SIZE.height()}".encode(), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.jpg")
+
+# Flag decode libjpeg terskala (IDCT 1/2, 1/4, 1/8), dari yang terbesar
+_REDUCED_IMREAD_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+def load_thumbnail_source(path, min_size):
+    """Membaca gambar (BGR) untuk thumbnail. JPEG di-decode langsung pada skala DCT terkecil (1/2..1/8)
+    yang masih >= min_size; ukuran asli diintip dari header lewat Pillow. Format lain memakai cv2.imread biasa."""
+    if os.path.splitext(path)[1].lower() in ('.jpg', '.jpeg'):
+        try:
+            with Image.open(path) as im: w, h = im.size # Hanya header
+        except Exception:
+            w = h = 0
+        side = max(min_size.width(), min_size.height()) # Sisi terpanjang, aman untuk gambar yang nanti diputar EXIF
+        for factor, flag in _REDUCED_IMREAD_FLAGS:
+            if min(w, h) // factor >= side:
+                img = cv2.imread(path, flag) # Orientasi EXIF tetap diterapkan oleh OpenCV
+                if img is not None: return img
+                break
+    return cv2.imread(path)
+
+FOLDER_PREVIEW_COUNT = 4
+FOLDER_COMPOSITE_SIZE = QSize(206, 114) # Isi thumbnail_container folder (210x118 dikurangi margin 2px)
+FOLDER_TILE_SIZE = QSize(102, 56) # 2x2 tile dengan jarak 2px
+
+def resize_center_crop(img, target_w, target_h):
+    """Mengisi target_w x target_h penuh (crop tengah). Bagian tengah dengan rasio target dipotong dulu (view,
+    tanpa salinan) lalu di-resize langsung ke ukuran akhir: satu lintasan piksel, tanpa buffer antara yang lebih besar."""
+    h, w = img.shape[:2]
+    crop_w, crop_h = min(w, max(1, round(h * target_w / target_h))), min(h, max(1, round(w * target_h / target_w)))
+    x0, y0 = (w - crop_w) // 2, (h - crop_h) // 2
+    # INTER_AREA hanya berguna untuk mengecilkan; gambar kecil (ikon) yang diperbesar cukup INTER_LINEAR
+    interp = cv2.INTER_AREA if (crop_w > target_w and crop_h > target_h) else cv2.INTER_LINEAR
+    return cv2.resize(img[y0:y0+crop_h, x0:x0+crop_w], (target_w, target_h), interpolation=interp)
+
+def get_folder_composite_cache_path(image_paths):
+    """Path cache komposit 2x2 sebuah folder. Kunci diturunkan dari path cache thumbnail pratinjaunya
+    (yang sudah memuat mtime/ukuran), jadi komposit ikut dibuat ulang bila salah satu gambar berubah."""
+    previews = "|".join(get_thumbnail_cache_path(p) for p in image_paths[:FOLDER_PREVIEW_COUNT])
+    key = hashlib.blake2b(previews.encode(), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, key[:2], f"folder_{key}.png")
+
+def build_folder_composite(image_paths, composite_path):
+    """Menyusun thumbnail pratinjau menjadi satu gambar 2x2 lalu menyimpannya sebagai PNG.
+    Seluruhnya di OpenCV/NumPy (INTER_AREA), jadi aman dan cepat di thread worker."""
+    tw, th = FOLDER_TILE_SIZE.width(), FOLDER_TILE_SIZE.height()
+    canvas = np.full((FOLDER_COMPOSITE_SIZE.height(), FOLDER_COMPOSITE_SIZE.width(), 3), 0x1E, dtype=np.uint8)
+    for i, path in enumerate(image_paths[:FOLDER_PREVIEW_COUNT]):
+        thumb = cv2.imread(get_thumbnail_cache_path(path))
+        if thumb is None: continue
+        x, y = (i % 2) * (tw + 2), (i // 2) * (th + 2)
+        canvas[y:y+th, x:x+tw] = resize_center_crop(thumb, tw, th)
+    ok, encoded = cv2.imencode('.png', canvas)
+    if not ok: return False
+    os.makedirs(os.path.dirname(composite_path), exist_ok=True)
+    write_file_atomic(composite_path, encoded)
+    return True
+
+def encode_thumbnail(img, cache_path):
+    """Crop tengah + resize gambar BGR ke THUMBNAIL_IMAGE_SIZE lalu menyimpannya sebagai JPEG cache."""
+    cropped_img = resize_center_crop(img, THUMBNAIL_IMAGE_SIZE.width(), THUMBNAIL_IMAGE_SIZE.height())
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    ok, encoded = cv2.imencode('.jpg', cropped_img, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
+    if ok: write_file_atomic(cache_path, encoded) # Crash di tengah tulis tidak meninggalkan JPEG rusak di cache
+    return ok
+
+def refresh_thumbnail(path, stale_cache_path, folder_image_paths=None, stale_composite_path=None):
+    """Membuat ulang thumbnail gambar yang baru diubah (dan komposit foldernya jika folder_image_paths diberikan),
+    lalu menghapus file cache versi lama. Mengembalikan (path, cache_path, composite_path); aman di thread background."""
+    cache_path = get_thumbnail_cache_path(path)
+    img = load_thumbnail_source(path, THUMBNAIL_IMAGE_SIZE)
+    if img is None or not encode_thumbnail(img, cache_path): raise IOError(f"Cannot create thumbnail: {path}")
+    composite_path = None
+    if folder_image_paths is not None:
+        composite_path = get_folder_composite_cache_path(folder_image_paths)
+        if not build_folder_composite(folder_image_paths, composite_path): composite_path = None
+    for stale_path in (stale_cache_path, stale_composite_path):
+        if stale_path and stale_path not in (cache_path, composite_path):
+            try: os.remove(stale_path)
+            except OSError: pass
+    return path, cache_path, composite_path
+
+@lru_cache(maxsize=64)
+def render_svg_icon(svg_xml, color, dpr=1.0):
+    """QIcon 24x24 dari string SVG, dirender sekali per (svg, warna, DPR) pada resolusi fisik layar."""
+    renderer = QSvgRenderer(QByteArray(svg_xml.replace('currentColor', color).encode('utf-8')))
+    side = round(24 * dpr)
+    pixmap = QPixmap(side, side)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    renderer.render(painter), painter.end()
+    pixmap.setDevicePixelRatio(dpr) # Ukuran logis tetap 24x24, tajam di layar HiDPI
+    return QIcon(pixmap)
+
+def load_cached_pixmap(path, size=None):
+    """QPixmap dari file cache thumbnail, disimpan di QPixmapCache (opsional sudah di-scale ke size).
+    Path cache sudah memuat mtime/ukuran gambar, jadi kunci lama tidak pernah terpakai salah."""
+    key = path if size is None else f"{path}@{size.width()}x{size.height()}"
+    pixmap = QPixmapCache.find(key)
+    if pixmap is not None and not pixmap.isNull(): return pixmap
+    pixmap = QPixmap(path)
+    if pixmap.isNull(): return pixmap # Belum ada: jangan di-cache, thumbnail mungkin masih dibuat
+    if size is not None: pixmap = pixmap.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    QPixmapCache.insert(key, pixmap)
+    return pixmap
 
 # --- Worker for Thumbnail Generation ---
 class ThumbnailWorker(QObject):
     thumbnail_ready = Signal(str, str)
+    folder_ready = Signal(str, str)
     finished = Signal()
 
-    def __init__(self, file_paths):
+    def __init__(self, file_paths, folders=None):
         super().__init__()
-        self.file_paths = file_paths
+        self.file_paths = list(dict.fromkeys(file_paths)) # Buang duplikat, urutan tetap
+        self.folders = folders or {}
+        self._cached = set()
         self.is_running = True
 
     def run(self):
         os.makedirs(CACHE_DIR, exist_ok=True)
-        for path in self.file_paths:
-            if not self.is_running:
-                break
-            path_hash = hashlib.md5(path.encode()).hexdigest()
-            cache_path = os.path.join(CACHE_DIR, f"{path_hash}.jpg")
-            if os.path.exists(cache_path):
-                self.thumbnail_ready.emit(path, cache_path)
-                continue
-            try:
-                img = cv2.imread(path)
-                if img is None: continue
-                h, w = img.shape[:2]
-                target_h, target_w = THUMBNAIL_IMAGE_SIZE.height(), THUMBNAIL_IMAGE_SIZE.width()
-                aspect_ratio_img = w / h
-                aspect_ratio_target = target_w / target_h
-                if aspect_ratio_img > aspect_ratio_target:
-                    new_h = target_h
-                    new_w = int(aspect_ratio_img * new_h)
-                else:
-                    new_w = target_w
-                    new_h = int(new_w / aspect_ratio_img)
-                resized_img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-                y_start = (new_h - target_h) // 2
-                x_start = (new_w - target_w) // 2
-                cropped_img = resized_img[y_start:y_start+target_h, x_start:x_start+target_w]
-                if cv2.imwrite(cache_path, cropped_img, [int(cv2.IMWRITE_JPEG_QUALITY), 90]):
-                     self.thumbnail_ready.emit(path, cache_path)
-            except Exception as e:
-                print(f"Error creating thumbnail for {path}: {e}")
+        self._cached = list_cached_files() # Sekali baca direktori, bukan os.path.exists per gambar
+        # Pratinjau folder dulu, lalu kompositnya, baru sisa gambar: tampilan folder lengkap lebih awal
+        previews = [p for paths in self.folders.values() for p in paths[:FOLDER_PREVIEW_COUNT]]
+        preview_set = set(previews)
+        rest = [p for p in self.file_paths if p not in preview_set]
+        # OpenCV melepas GIL saat imread/resize/imwrite, jadi thread cukup untuk memakai semua core
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as ex:
+            for stage, items in ((self._process_one, previews), (self._process_folder, self.folders.items()), (self._process_one, rest)):
+                for _ in ex.map(stage, items):
+                    if not self.is_running: break
+                if not self.is_running: break
         self.finished.emit()
 
+    def _process_folder(self, item):
+        if not self.is_running: return
+        folder_path, image_paths = item
+        try:
+            composite_path = get_folder_composite_cache_path(image_paths)
+            if composite_path in self._cached or build_folder_composite(image_paths, composite_path):
+                self.folder_ready.emit(folder_path, composite_path)
+        except Exception as e:
+            print(f"Error creating folder preview for {folder_path}: {e}")
+
+    def _process_one(self, path):
+        if not self.is_running: return
+        cache_path = get_thumbnail_cache_path(path)
+        if cache_path in self._cached:
+            self.thumbnail_ready.emit(path, cache_path)
+            return
+        try:
+            img = load_thumbnail_source(path, THUMBNAIL_IMAGE_SIZE)
+            if img is None or not self.is_running: return # Decode bisa lama; cek lagi agar stop() cepat berlaku
+            if encode_thumbnail(img, cache_path): self.thumbnail_ready.emit(path, cache_path)
+        except Exception as e:
+            print(f"Error creating thumbnail for {path}: {e}")
+
     def stop(self):
         self.is_running = False
 
+@lru_cache(maxsize=256)
+def get_image_dimensions(path, mtime_ns, size):
+    """(lebar, tinggi) gambar. mtime/ukuran hanya bagian kunci cache, agar file yang diubah dibaca ulang."""
+    try:
+        # Pillow hanya membaca header, pixel tidak di-decode
+        with Image.open(path) as im:
+            w, h = im.size
+            # Orientation EXIF 5-8 berarti gambar diputar 90°: samakan dengan viewer/thumbnail (cv2 menerapkan orientasi)
+            return (h, w) if im.getexif().get(274, 1) in (5, 6, 7, 8) else (w, h)
+    except UnidentifiedImageError:
+        img = cv2.imread(path)
+        if img is None: raise IOError(f"Cannot read image: {path}")
+        return img.shape[1], img.shape[0]
+
+def advise_willneed(paths):
+    """Minta OS membaca file ke page cache di latar belakang (posix_fadvise WILLNEED); no-op di platform lain."""
+    if not hasattr(os, 'posix_fadvise'): return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try: os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally: os.close(fd)
+        except OSError: pass
+
+def decode_image_for_cache(path, cached_key=None):
+    """Decode gambar (BGR) untuk cache viewer. Mengembalikan (kunci cache, array); aman di thread background.
+    Jika file tidak berubah sejak cached_key (sudah ada di cache), array-nya None dan tidak di-decode ulang."""
+    st = os.stat(path)
+    if (path, st.st_mtime_ns, st.st_size) == cached_key: return cached_key, None
+    cv_image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if cv_image is None: raise Exception("OpenCV failed to open the image file.")
+    return (path, st.st_mtime_ns, st.st_size), cv_image
+
+def build_exif_html(path):
+    """Membaca data EXIF sebuah gambar dan menyusunnya sebagai tabel HTML. Mengembalikan (path, html)."""
+    try:
+        with Image.open(path) as img:
+            exif_data_raw = img.getexif()
+        if not exif_data_raw:
+            return path, "<b>No EXIF data found.</b>"
+
+        exif_data = {TAGS.get(tag, tag): value for tag, value in exif_data_raw.items()}
+        
+        html = "<style>td { padding: 2px 5px; }</style><table>"
+        for tag in EXIF_DISPLAY_TAGS:
+            if tag in exif_data:
+                value = exif_data[tag]
+                if isinstance(value, bytes):
+                    value = value.decode(errors='ignore')
+                html += f"<tr><td><b>{tag}</b></td><td>{value}</td></tr>"
+
+        html += "</table>"
+        return path, html
+
+    except Exception as e:
+        return path, f"<b>Could not read EXIF data.</b><br><br>Reason: {e}"
+
+# --- Worker generik untuk QThreadPool ---
+class TaskSignals(QObject):
+    finished = Signal(object)
+    error = Signal(str)
+
+class BackgroundTask(QRunnable):
+    """Menjalankan fungsi biasa di QThreadPool dan mengirim hasilnya lewat signal."""
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn, self.args = fn, args
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
 # --- Thumbnail Widgets ---
 class ThumbnailWidget(QFrame):
-    def __init__(self, file_path, main_window, parent=None):
+    def __init__(self, file_path, main_window, file_name=None, parent=None):
         super().__init__(parent)
-        self.file_path = file_path
         self.main_window = main_window
-        self.metadata = read_metadata(self.file_path)
 
         self.setFixedSize(220, 180)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.setObjectName("thumbnailCard")
-        self.setStyleSheet("""
-            #thumbnailCard {
-                background-color: #252526; border: 1px solid #333333; border-radius: 8px;
-            }
-            #thumbnailCard:hover {
-                background-color: #333333; border: 1px solid #007ACC;
-            }
-            QLabel { color: #FFFFFF; border: none; }
-        """)
+        self.setObjectName("thumbnailCard") # Gaya kartu ada di stylesheet MacanGallery
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(5, 5, 5, 5)
@@ -155,14 +732,11 @@ class ThumbnailWidget(QFrame):
 
         self.thumbnail_label = QLabel()
         self.thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.thumbnail_label.setStyleSheet("border-radius: 5px; background-color: #1E1E1E;")
-        self.thumbnail_label.setFixedSize(210, 118)
-
-        self.update_pixmap()
+        self.thumbnail_label.setObjectName("thumbnailImage")
+        self.thumbnail_label.setFixedSize(THUMBNAIL_IMAGE_SIZE)
 
         title_layout = QHBoxLayout()
-        file_name = os.path.splitext(os.path.basename(file_path))[0]
-        self.title_label = QLabel(file_name)
+        self.title_label = QLabel()
         self.title_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
         self.title_label.setWordWrap(True)
 
@@ -182,12 +756,23 @@ class ThumbnailWidget(QFrame):
         info_layout.addWidget(self.rating_label)
         info_layout.addStretch()
         info_layout.addWidget(self.color_label_indicator)
-        self.update_metadata_display()
 
         layout.addWidget(self.thumbnail_label)
         layout.addWidget(self.title_label)
         layout.addLayout(info_layout)
         layout.addStretch()
+        self.reconfigure(file_path, file_name)
+
+    def reconfigure(self, file_path, file_name=None):
+        """Mengisi widget untuk gambar lain; dipakai juga saat widget diambil ulang dari pool grid."""
+        self.file_path = file_path
+        self.update_pixmap(self.main_window.thumbnail_cache_paths.get(file_path))
+        self.title_label.setText(os.path.splitext(file_name or os.path.basename(file_path))[0]) # Nama sudah diketahui dari scan
+        # [PERUBAHAN] Set status checkbox sesuai data seleksi
+        self.select_check.blockSignals(True)
+        self.select_check.setChecked(file_path in self.main_window.selected_files)
+        self.select_check.blockSignals(False)
+        self.update_metadata_display()
 
     # [PERUBAHAN] Fungsi baru untuk menangani klik checkbox
     def on_selection_changed(self, checked):
@@ -197,29 +782,26 @@ class ThumbnailWidget(QFrame):
             self.main_window.selected_files.discard(self.file_path)
         self.main_window.update_selection_status()
 
-    def update_metadata_display(self):
-        self.metadata = read_metadata(self.file_path)
+    def update_metadata_display(self, metadata=None):
+        self.metadata = read_metadata(self.file_path) if metadata is None else metadata
         rating = self.metadata.get('rating', 0)
         self.rating_label.setText("★" * rating + "☆" * (5 - rating))
         
         # [PERUBAHAN] Warna disesuaikan
-        color_map = {"red": "#D16969", "yellow": "#EBCB8B", "green": "#A3BE8C", "blue": "#007ACC"}
         label_color = self.metadata.get('label_color')
-        if label_color in color_map:
-            self.color_label_indicator.setStyleSheet(f"background-color: {color_map[label_color]}; border-radius: 5px;")
+        if label_color in LABEL_COLOR_HEX:
+            self.color_label_indicator.setStyleSheet(f"background-color: {LABEL_COLOR_HEX[label_color]}; border-radius: 5px;")
             self.color_label_indicator.setVisible(True)
         else:
             self.color_label_indicator.setVisible(False)
 
-    def update_pixmap(self):
-        path_hash = hashlib.md5(self.file_path.encode()).hexdigest()
-        cache_path = os.path.join(CACHE_DIR, f"{path_hash}.jpg")
-        pixmap = QPixmap(cache_path)
+    def update_pixmap(self, cache_path=None):
+        if cache_path is None: cache_path = get_thumbnail_cache_path(self.file_path)
+        pixmap = load_cached_pixmap(cache_path) # Cache sudah seukuran label
         if pixmap.isNull():
             self.thumbnail_label.setText("...")
         else:
-            scaled_pixmap = pixmap.scaled(self.thumbnail_label.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            self.thumbnail_label.setPixmap(scaled_pixmap)
+            self.thumbnail_label.setPixmap(pixmap)
 
     def mouseDoubleClickEvent(self, event: QMouseEvent):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -300,42 +882,37 @@ class ThumbnailWidget(QFrame):
 class FolderThumbnailWidget(QFrame):
     def __init__(self, folder_path, image_paths, main_window, parent=None):
         super().__init__(parent)
-        self.folder_path, self.image_paths, self.main_window = folder_path, image_paths, main_window
+        self.main_window = main_window
         self.setFixedSize(220, 180)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.setObjectName("thumbnailCard")
-        # [PERUBAHAN] Stylesheet diubah ke hitam
-        self.setStyleSheet("""
-            #thumbnailCard { background-color: #252526; border: 1px solid #333333; border-radius: 8px; }
-            #thumbnailCard:hover { background-color: #333333; border: 1px solid #007ACC; }
-            QLabel { color: #FFFFFF; border: none; }
-        """)
+        self.setObjectName("thumbnailCard") # Gaya kartu ada di stylesheet MacanGallery
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(5, 5, 5, 5)
         thumbnail_container = QWidget()
         thumbnail_container.setFixedSize(210, 118)
-        thumbnail_container.setStyleSheet("border-radius: 5px; background-color: #1E1E1E;")
-        grid_layout = QGridLayout(thumbnail_container)
-        grid_layout.setContentsMargins(2, 2, 2, 2)
-        grid_layout.setSpacing(2)
-        images_to_preview, positions = self.image_paths[:4], [(0, 0), (0, 1), (1, 0), (1, 1)]
-        for i, path in enumerate(images_to_preview):
-            thumb_label = QLabel()
-            path_hash = hashlib.md5(path.encode()).hexdigest()
-            cache_path = os.path.join(CACHE_DIR, f"{path_hash}.jpg")
-            pixmap = QPixmap(cache_path)
-            if not pixmap.isNull():
-                thumb_label.setPixmap(pixmap.scaled(QSize(103, 57), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation))
-            else:
-                thumb_label.setText("...")
-            thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            grid_layout.addWidget(thumb_label, positions[i][0], positions[i][1])
-        folder_name, item_count = os.path.basename(self.folder_path), len(self.image_paths)
-        self.title_label = QLabel(f"{folder_name}\n({item_count} items)")
+        thumbnail_container.setObjectName("thumbnailImage"), thumbnail_container.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        container_layout = QVBoxLayout(thumbnail_container)
+        container_layout.setContentsMargins(2, 2, 2, 2)
+        # Komposit 2x2 disusun oleh ThumbnailWorker (lihat build_folder_composite), di sini cukup dimuat
+        self.preview_label = QLabel()
+        self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        container_layout.addWidget(self.preview_label)
+        self.title_label = QLabel()
         self.title_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
         self.title_label.setWordWrap(True)
         main_layout.addWidget(thumbnail_container)
         main_layout.addWidget(self.title_label)
+        self.reconfigure(folder_path, image_paths)
+    def reconfigure(self, folder_path, image_paths):
+        """Mengisi widget untuk folder lain; dipakai juga saat widget diambil ulang dari pool grid."""
+        self.folder_path, self.image_paths = folder_path, image_paths
+        self.update_composite()
+        self.title_label.setText(f"{os.path.basename(folder_path)}\n({len(image_paths)} items)")
+    def update_composite(self, composite_path=None):
+        if composite_path is None: composite_path = get_folder_composite_cache_path(self.image_paths)
+        pixmap = load_cached_pixmap(composite_path)
+        if pixmap.isNull(): self.preview_label.setText("...")
+        else: self.preview_label.setPixmap(pixmap)
     def mouseDoubleClickEvent(self, event: QMouseEvent):
         if event.button() == Qt.MouseButton.LeftButton: self.main_window.show_folder_contents(self.folder_path)
         super().mouseDoubleClickEvent(event)
@@ -408,10 +985,25 @@ class ManageDialog(QDialog):
             if not os.path.exists(CACHE_DIR):
                 self.cache_info_label.setText(f"Location: {CACHE_DIR}\nCache is empty.")
                 return
-            total_size = sum(os.path.getsize(os.path.join(CACHE_DIR, f)) for f in os.listdir(CACHE_DIR) if os.path.isfile(os.path.join(CACHE_DIR, f)))
-            file_count = len(os.listdir(CACHE_DIR))
-            self.cache_info_label.setText(f"Location: {CACHE_DIR}\nSize: {get_human_readable_size(total_size)} ({file_count} files)")
-        except Exception as e: self.cache_info_label.setText(f"Could not read cache info: {e}")
+            # Hasil terakhir disimpan di settings; dihitung ulang (di background) bila sudah dibuang. Setiap tempat yang
+            # menulis/menghapus file cache membuang "cache_stats" (mtime CACHE_DIR tidak berubah untuk file di dalam shard)
+            cached = self.settings.value("cache_stats", [], type=list)
+            if len(cached) == 2:
+                self._show_cache_info(int(cached[0]), int(cached[1]))
+                return
+        except Exception as e:
+            self.cache_info_label.setText(f"Could not read cache info: {e}")
+            return
+        self.cache_info_label.setText(f"Location: {CACHE_DIR}\nCalculating size...")
+        task = BackgroundTask(measure_cache_usage)
+        task.signals.finished.connect(self._on_cache_usage_ready)
+        task.signals.error.connect(lambda msg: self.cache_info_label.setText(f"Could not read cache info: {msg}"))
+        QThreadPool.globalInstance().start(task)
+    def _on_cache_usage_ready(self, stats):
+        self.settings.setValue("cache_stats", [str(v) for v in stats])
+        self._show_cache_info(*stats)
+    def _show_cache_info(self, total_size, file_count):
+        self.cache_info_label.setText(f"Location: {CACHE_DIR}\nSize: {get_human_readable_size(total_size)} ({file_count} files)")
     def clear_cache(self):
         reply = QMessageBox.question(self, "Confirm Clear Cache", "Are you sure you want to delete all cached thumbnails?\nThey will be regenerated when you next open the gallery.", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
@@ -419,6 +1011,7 @@ class ManageDialog(QDialog):
                 if os.path.exists(CACHE_DIR):
                     shutil.rmtree(CACHE_DIR)
                     os.makedirs(CACHE_DIR, exist_ok=True)
+                QPixmapCache.clear(), self.settings.remove("cache_stats")
                 QMessageBox.information(self, "Success", "Thumbnail cache cleared successfully.")
                 self.update_cache_info()
             except Exception as e: QMessageBox.critical(self, "Error", f"Failed to clear cache: {e}")
@@ -432,10 +1025,33 @@ class MacanGallery(QMainWindow):
     def __init__(self):
         super().__init__()
         self.settings = QSettings(ORGANIZATION_NAME, APP_NAME)
+        QPixmapCache.setCacheLimit(PIXMAP_CACHE_LIMIT_KB) # Thumbnail tetap di RAM saat grid dibangun ulang
         self.clipboard_cut_path, self.thumbnail_thread, self.thumbnail_worker = None, None, None
-        self.grouped_images, self.thumbnail_widgets = {}, {}
+        self._moving = set() # Sumber paste yang sedang dipindah di background
+        self.grouped_images, self.thumbnail_widgets, self.folder_widgets = {}, {}, {}
+        self._thumb_pool, self._folder_pool = [], [] # Widget grid yang sedang tidak dipakai
+        self.image_names = {} # path -> nama file, dicatat saat scan agar tidak di-parse ulang tiap reflow
+        self._folder_snapshots = {} # Isi folder dari scan terakhir, dipakai ulang jika mtime folder tidak berubah
+        self.thumbnail_cache_paths = {} # path -> file cache thumbnail dari worker; reflow tidak perlu os.stat lagi
+        self._grid_items, self._grid_created, self._grid_columns, self._grid_spacer = [], 0, 1, None
+        self._grid_live = (0, 0) # Rentang indeks _grid_items yang sedang punya widget di grid
+        self._last_layout_key = None
+        self._scan_gen = 0
+        self._edge_bounds = (1 << 30, 1 << 30) # Batas kanan/bawah zona resize, diisi resizeEvent
+        self._edge_cursors = {shape: QCursor(shape) for shape in self._EDGE_CURSORS if shape is not None}
+        self._hover_edge = None
+        self.old_pos, self.is_resizing, self.resize_edge = None, False, None # State drag/resize jendela frameless
+        self._last_viewer_size = None # Ukuran viewport viewer saat pixmap terakhir disegarkan karena resize
+        self._pending_geom = None # Geometri resize jendela yang menunggu diterapkan
+        self._pending_pos = None # Posisi jendela (drag toolbar) yang menunggu diterapkan
         self.current_view, self.selected_folder = 'folders', None
-        self.current_viewer_pixmap = None
+        self.current_viewer_pixmap, self._viewer_array = None, None
+        self._zoom_cache = OrderedDict() # (zoom) -> QPixmap hasil scale dari current_viewer_pixmap
+        self._decoded_cache = OrderedDict() # (path, mtime_ns, size) -> array BGR hasil decode
+        self._scratch = {} # Buffer antara apply_image_edits, hanya dipakai dari _edit_pool
+        self._preview_scratch = {} # Sama, untuk preview berukuran tampilan (ukurannya beda dengan gambar penuh)
+        self._preview_source = (None, None, None) # (original, ukuran, hasil resize) untuk preview slider
+        self._edit_result_cache = OrderedDict() # (b, c%, s%, ukuran preview) -> (original, hasil edit); hanya dari _edit_pool
         self.original_pixmap_for_editing = None 
         self.original_cv_image = None 
         self.current_image_path, self.current_image_list, self.current_image_index = None, [], -1
@@ -445,11 +1061,29 @@ class MacanGallery(QMainWindow):
         self.pan_last_mouse_pos = QPoint()
         self.slideshow_timer = QTimer(self)
         self.slideshow_timer.timeout.connect(self.show_next_image)
+        # Beberapa paste beruntun cukup memicu satu scan ulang, 150 ms setelah yang terakhir selesai
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(150)
+        self._rescan_timer.timeout.connect(self.start_scanning_folders)
         
         # [PERUBAHAN] Set untuk melacak file yang dipilih
         self.selected_files = set()
 
-        self.current_edits = {'brightness': 0, 'contrast': 1.0, 'saturation': 1.0}
+        self.edit_brightness, self.edit_contrast, self.edit_saturation = 0, 1.0, 1.0
+
+        # Pool kecil khusus EXIF agar navigasi gambar tidak menunggu parsing file
+        self._edit_pool = QThreadPool(self)
+        self._edit_pool.setMaxThreadCount(1) # cv2 sudah paralel di dalam; satu preview sekaligus cukup
+        self._edit_gen = 0
+        self._saved_edits_gen = -1 # Generasi render editan tersimpan (show_image_view); hasilnya juga jadi dasar rotate/flip
+        if warm_up_edits_kernel is not None: self._edit_pool.start(BackgroundTask(warm_up_edits_kernel))
+        self._exif_cache = OrderedDict() # (path, mtime_ns, size) -> html
+        self._exif_pool = QThreadPool(self)
+        self._exif_pool.setMaxThreadCount(2)
+        self._prefetch_pool = QThreadPool(self)
+        self._prefetch_pool.setMaxThreadCount(1) # Satu decode tetangga sekaligus, tidak berebut dengan preview edit
+        self._prefetching = set()
 
         self.init_ui()
         self.load_settings()
@@ -486,7 +1120,9 @@ class MacanGallery(QMainWindow):
         self.grid_container = QWidget()
         self.grid_layout = QGridLayout(self.grid_container)
         self.grid_layout.setSpacing(15)
+        self._grid_margins = self.grid_layout.contentsMargins() # Tinggi baris tanpa widget ditambahkan ke margin ini
         self.scroll_area.setWidget(self.grid_container)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self._fill_grid)
         gallery_layout.addWidget(self.scroll_area)
         self.main_stack.addWidget(gallery_widget)
         
@@ -549,9 +1185,14 @@ class MacanGallery(QMainWindow):
         self.create_status_bar()
         self.grid_container.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.grid_container.customContextMenuRequested.connect(self.show_context_menu)
+        self._create_context_menus()
         self.search_timer = QTimer()
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self.reflow_ui)
+        self._metadata_flush_timer = QTimer(self)
+        self._metadata_flush_timer.setSingleShot(True)
+        self._metadata_flush_timer.setInterval(250)
+        self._metadata_flush_timer.timeout.connect(self._flush_metadata_writes)
 
     def apply_stylesheet(self):
         # [PERUBAHAN] Stylesheet diubah ke hitam, padding tombol diperkecil
@@ -580,6 +1221,11 @@ class MacanGallery(QMainWindow):
             QSlider::groove:horizontal { border: 1px solid #444444; background: #1E1E1E; height: 4px; border-radius: 2px; }
             QSlider::handle:horizontal { background: #007ACC; border: 1px solid #007ACC; width: 14px; margin: -5px 0; border-radius: 7px; }
             QScrollArea { border: none; background-color: #1E1E1E; }
+            /* Kartu thumbnail/folder: di-parse sekali di sini, bukan setStyleSheet per widget grid */
+            #thumbnailCard { background-color: #252526; border: 1px solid #333333; border-radius: 8px; }
+            #thumbnailCard:hover { background-color: #333333; border: 1px solid #007ACC; }
+            #thumbnailCard QLabel { color: #FFFFFF; border: none; }
+            #thumbnailImage { border-radius: 5px; background-color: #1E1E1E; }
             QPushButton { background-color: #007ACC; color: #FFFFFF; border: none; padding: 5px 10px; border-radius: 4px; }
             QPushButton:hover { background-color: #0090F0; }
             QPushButton#navButton { background-color: rgba(30, 30, 30, 0.6); border: 1px solid #444444; border-radius: 20px; }
@@ -602,12 +1248,7 @@ class MacanGallery(QMainWindow):
         """)
 
     def _create_svg_icon(self, svg_xml, color="#FFFFFF"): # [PERUBAHAN] Warna default ke putih
-        renderer = QSvgRenderer(QByteArray(svg_xml.replace('currentColor', color).encode('utf-8')))
-        pixmap = QPixmap(24, 24)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(pixmap)
-        renderer.render(painter), painter.end()
-        return QIcon(pixmap)
+        return render_svg_icon(svg_xml, color, self.devicePixelRatioF())
 
     def create_actions(self):
         self.manage_action = QAction("Manage Folders", self, triggered=self.open_manage_dialog)
@@ -689,7 +1330,8 @@ class MacanGallery(QMainWindow):
         self.restore_svg = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M8 3H5a2 2 0 0 0-2 2v3m18 0V5a2 2 0 0 0-2-2h-3m0 18h3a2 2 0 0 0 2-2v-3M3 16v3a2 2 0 0 0 2 2h3"></path></svg>'
         close_svg = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><path d="M6 6 L18 18 M18 6 L6 18"></path></svg>'
         self.minimize_action = QAction(self._create_svg_icon(minimize_svg), "Minimize", self, triggered=self.showMinimized)
-        self.maximize_action = QAction(self._create_svg_icon(maximize_svg), "Maximize", self, triggered=self.toggle_maximize_restore)
+        self._maximize_icon, self._restore_icon = self._create_svg_icon(maximize_svg), self._create_svg_icon(self.restore_svg)
+        self.maximize_action = QAction(self._maximize_icon, "Maximize", self, triggered=self.toggle_maximize_restore)
         self.close_action = QAction(self._create_svg_icon(close_svg), "Close", self, objectName="close_button", triggered=self.close)
         self.tool_bar.addAction(self.minimize_action), self.tool_bar.addAction(self.maximize_action), self.tool_bar.addAction(self.close_action)
 
@@ -760,7 +1402,19 @@ class MacanGallery(QMainWindow):
         separator, self.zoom_label = QLabel(" | "), QLabel("100%")
         self.zoom_slider = QSlider(Qt.Orientation.Horizontal)
         self.zoom_slider.setRange(10, 400), self.zoom_slider.setValue(100)
-        self.zoom_slider.setFixedWidth(150), self.zoom_slider.valueChanged.connect(self.update_zoom)
+        self._zoom_debounce = QTimer(self)
+        self._zoom_debounce.setSingleShot(True)
+        self._zoom_debounce.setInterval(40)
+        self._zoom_debounce.timeout.connect(lambda: self.update_zoom(self.zoom_slider.value()))
+        # Selama slider ditarik / wheel berputar pakai skala cepat; versi halus dirender setelah selesai
+        self._zoom_dragging = False
+        self._zoom_settle = QTimer(self)
+        self._zoom_settle.setSingleShot(True)
+        self._zoom_settle.setInterval(200)
+        self._zoom_settle.timeout.connect(lambda: self.update_zoom(self.zoom_slider.value()))
+        self.zoom_slider.sliderPressed.connect(self._on_zoom_slider_pressed)
+        self.zoom_slider.sliderReleased.connect(self._on_zoom_slider_released)
+        self.zoom_slider.setFixedWidth(150), self.zoom_slider.valueChanged.connect(self._schedule_zoom)
         self.statusbar.addPermanentWidget(separator), self.statusbar.addPermanentWidget(self.zoom_label), self.statusbar.addPermanentWidget(self.zoom_slider)
         separator.hide(), self.zoom_label.hide(), self.zoom_slider.hide()
         self.file_count_label = QLabel("")
@@ -784,67 +1438,78 @@ class MacanGallery(QMainWindow):
             self.thumbnail_worker.stop()
             self.thumbnail_thread.quit()
             self.thumbnail_thread.wait()
-        self.grouped_images.clear()
+        self._scan_gen += 1 # Hasil scan yang lebih lama diabaikan
+        self._last_layout_key = None
         folders = self.settings.value("gallery_folders", [], type=list)
         if not folders:
+            self.grouped_images.clear(), self.image_names.clear()
             self.status_label.setText("No folders selected. Go to File > Manage to add folders.")
             self.file_count_label.setText("0 images")
             self.reflow_ui()
             return
-        all_image_paths = []
-        for base_folder in folders:
-            self.status_label.setText(f"Scanning {base_folder}..."), QApplication.processEvents()
-            try:
-                for dirpath, _, filenames in os.walk(base_folder):
-                    images_in_current_folder = []
-                    for filename in filenames:
-                        _, ext = os.path.splitext(filename)
-                        if ext.lower() in SUPPORTED_IMAGE_EXTENSIONS:
-                            images_in_current_folder.append(os.path.join(dirpath, filename))
-                    if images_in_current_folder:
-                        self.grouped_images[dirpath] = sorted(images_in_current_folder)
-                        all_image_paths.extend(images_in_current_folder)
-            except Exception as e: print(f"Could not scan folder {base_folder}: {e}")
+        # Scan folder bisa lama di disk jaringan; jalankan di background, galeri lama tetap tampil sampai selesai
+        self.status_label.setText(f"Scanning {len(folders)} folder(s)...")
+        task = BackgroundTask(scan_image_folders, folders, self._folder_snapshots)
+        task.signals.finished.connect(partial(self._on_scan_finished, self._scan_gen))
+        task.signals.error.connect(lambda msg: self.status_label.setText(f"Scan failed: {msg}"))
+        QThreadPool.globalInstance().start(task)
+
+    def _on_scan_finished(self, scan_gen, result):
+        if scan_gen != self._scan_gen: return
+        grouped_images, image_names, all_image_paths = result
+        self.grouped_images.clear(), self.grouped_images.update(grouped_images)
+        self.image_names.clear(), self.image_names.update(image_names)
+        self.thumbnail_cache_paths.clear() # mtime bisa berubah sejak scan lalu; diisi ulang oleh worker
         self.file_count_label.setText(f"{len(self.grouped_images)} folders, {len(all_image_paths)} images")
         self.status_label.setText("Generating thumbnails in background...")
+        self.settings.remove("cache_stats") # Juga di awal: worker yang terhenti saat aplikasi ditutup tidak sempat sampai finished
         self.show_folders_view() 
-        self.thumbnail_thread, self.thumbnail_worker = QThread(), ThumbnailWorker(all_image_paths)
+        self.thumbnail_thread, self.thumbnail_worker = QThread(), ThumbnailWorker(all_image_paths, dict(self.grouped_images))
         self.thumbnail_worker.moveToThread(self.thumbnail_thread)
         self.thumbnail_worker.thumbnail_ready.connect(self.update_thumbnail_widget)
+        self.thumbnail_worker.folder_ready.connect(self.update_folder_widget)
         self.thumbnail_worker.finished.connect(self.on_thumbnailing_finished)
         self.thumbnail_thread.started.connect(self.thumbnail_worker.run), self.thumbnail_thread.start()
 
     def update_thumbnail_widget(self, original_path, cache_path):
+        self.thumbnail_cache_paths[original_path] = cache_path
         if original_path in self.thumbnail_widgets:
             widget = self.thumbnail_widgets[original_path]
-            widget.update_pixmap()
+            widget.update_pixmap(cache_path)
             widget.update_metadata_display()
             
+    def update_folder_widget(self, folder_path, composite_path):
+        if folder_path in self.folder_widgets:
+            self.folder_widgets[folder_path].update_composite(composite_path)
+
+    def _on_thumbnail_refreshed(self, result):
+        path, cache_path, composite_path = result
+        self.settings.remove("cache_stats") # Dialog Manage mungkin menghitung ulang selagi refresh berjalan
+        self.update_thumbnail_widget(path, cache_path)
+        if composite_path: self.update_folder_widget(os.path.dirname(path), composite_path)
+
     def on_thumbnailing_finished(self):
+        self.settings.remove("cache_stats") # Thumbnail baru mungkin ditambahkan; ukuran cache dihitung ulang di Manage
         self.status_label.setText("Ready")
         self.update_selection_status() # Pastikan status selection benar
         if self.thumbnail_thread:
             self.thumbnail_thread.quit(), self.thumbnail_thread.wait()
 
     def reflow_ui(self):
+        # Widget lama disembunyikan dan disimpan untuk dipakai ulang (lihat _fill_grid), bukan dihapus
         while self.grid_layout.count():
-            child = self.grid_layout.takeAt(0)
-            if child.widget(): child.widget().deleteLater()
-        self.thumbnail_widgets.clear()
-        columns, search_term = max(1, (self.scroll_area.width() - 30) // 240), self.search_bar.text().lower()
+            widget = self.grid_layout.takeAt(0).widget()
+            if widget is not None: self._recycle_grid_widget(widget)
+        self.thumbnail_widgets.clear(), self.folder_widgets.clear()
+        columns, search_term = self._grid_column_count(), self.search_bar.text().lower()
+        self._last_layout_key = self._grid_layout_key()
+        items = []
         if self.current_view == 'folders':
             self.back_button.setVisible(False)
             folder_paths = sorted(self.grouped_images.keys())
             if self.current_sort_method == "name_desc": folder_paths.reverse()
             if search_term: folder_paths = [f for f in folder_paths if search_term in os.path.basename(f).lower()]
-            row, col = 0, 0
-            for folder_path in folder_paths:
-                image_paths = self.grouped_images[folder_path]
-                if not image_paths: continue
-                folder_widget = FolderThumbnailWidget(folder_path, image_paths, self)
-                self.grid_layout.addWidget(folder_widget, row, col)
-                col += 1
-                if col >= columns: col, row = 0, row + 1
+            items = [f for f in folder_paths if self.grouped_images[f]]
         elif self.current_view == 'images' and self.selected_folder:
             self.back_button.setVisible(True)
             image_paths = self._get_filtered_and_sorted_list()
@@ -852,7 +1517,7 @@ class MacanGallery(QMainWindow):
             if search_term:
                 filtered_by_search = []
                 for p in image_paths:
-                    if search_term in os.path.basename(p).lower():
+                    if search_term in (self.image_names.get(p) or os.path.basename(p)).lower():
                         filtered_by_search.append(p)
                         continue
                     metadata = read_metadata(p)
@@ -860,42 +1525,111 @@ class MacanGallery(QMainWindow):
                     if any(search_term in tag.lower() for tag in tags):
                         filtered_by_search.append(p)
                 image_paths = filtered_by_search
-            
-            row, col = 0, 0
-            for path in image_paths:
-                thumb_widget = ThumbnailWidget(path, self)
-                
-                # [PERUBAHAN] Set status checkbox sesuai data seleksi
-                if path in self.selected_files:
-                    thumb_widget.select_check.blockSignals(True)
-                    thumb_widget.select_check.setChecked(True)
-                    thumb_widget.select_check.blockSignals(False)
-                    
-                self.thumbnail_widgets[path] = thumb_widget
-                self.grid_layout.addWidget(thumb_widget, row, col)
-                col += 1
-                if col >= columns: col, row = 0, row + 1
-        self.grid_layout.addItem(QSpacerItem(0, 0, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding), self.grid_layout.rowCount(), 0, 1, -1)
+            items = image_paths
+        # Widget dibuat bertahap sesuai posisi scroll (lihat _fill_grid), bukan semuanya sekaligus
+        self._grid_items, self._grid_created, self._grid_columns, self._grid_live = items, 0, columns, (0, 0)
+        self.grid_layout.setContentsMargins(self._grid_margins)
+        self._grid_spacer = QSpacerItem(0, 0, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding)
+        self.grid_layout.addItem(self._grid_spacer, 0, 0, 1, -1)
+        self._fill_grid()
         self.update_selection_status() # Update status setelah reflow
 
+    def _grid_column_count(self):
+        return max(1, (self.scroll_area.width() - 30) // 240)
+
+    def _grid_layout_key(self):
+        return (self._grid_column_count(), self.current_view, self.selected_folder, self.search_bar.text().lower(),
+                self.current_sort_method, self.current_filter_method)
+
+    def _on_resize_settled(self):
+        if self.main_stack.currentIndex() == 1 and self.current_viewer_pixmap:
+            # Perubahan viewport < 4 px tidak terlihat; lewati setPixmap/adjustSize ulang
+            size, last = self.viewer_scroll_area.viewport().size(), self._last_viewer_size
+            if last is None or abs(size.width() - last.width()) >= 4 or abs(size.height() - last.height()) >= 4:
+                self._last_viewer_size = size
+                self.update_zoom(self.zoom_slider.value()) # Skala bergantung pada zoom saja, jadi biasanya diambil dari _zoom_cache
+        # Resize yang tidak mengubah jumlah kolom tidak perlu membangun ulang grid; cukup isi jika viewport makin tinggi
+        if self._grid_layout_key() == self._last_layout_key: self._fill_grid()
+        else: self.reflow_ui()
+
+    def _fill_grid(self, _value=None):
+        """Menjaga widget hanya untuk baris di sekitar viewport (plus GRID_PREFETCH_ROWS di atas dan bawah).
+        Baris yang keluar dari jangkauan dikembalikan ke pool; tingginya diganti margin layout agar posisi scroll tetap."""
+        items, columns = self._grid_items, self._grid_columns
+        top = self.scroll_area.verticalScrollBar().value()
+        bottom = top + self.scroll_area.viewport().height()
+        first = min(len(items), max(0, top // GRID_ROW_HEIGHT - GRID_PREFETCH_ROWS) * columns)
+        target = min(len(items), (bottom // GRID_ROW_HEIGHT + 1 + GRID_PREFETCH_ROWS) * columns)
+        start, end = self._grid_live
+        if (start, end) == (first, target): return
+        if end <= first or start >= target: # Lompatan jauh: tidak ada baris lama yang masih terlihat
+            for i in range(start, end): self._release_grid_item(i)
+            start = end = first
+        else:
+            for i in range(start, min(first, end)): self._release_grid_item(i)
+            for i in range(max(target, start), end): self._release_grid_item(i)
+            start, end = max(start, first), min(end, target)
+        # Dibuat per batch; sisanya dijadwalkan lagi agar paint pertama tidak menunggu semua widget
+        budget = GRID_INSERT_BATCH
+        self.grid_layout.removeItem(self._grid_spacer)
+        while end < target and budget: self._place_grid_item(end); end += 1; budget -= 1
+        while start > first and budget: start -= 1; self._place_grid_item(start); budget -= 1
+        self._grid_live, self._grid_created = (start, end), max(self._grid_created, end)
+        # Baris kosong di QGridLayout tidak memakan tempat; baris yang sudah pernah terlihat tetap dihitung agar scrollbar tidak melompat
+        rows_above, rows_below = start // columns, -(-self._grid_created // columns) - -(-end // columns)
+        m = self._grid_margins
+        self.grid_layout.setContentsMargins(m.left(), m.top() + rows_above * GRID_ROW_HEIGHT, m.right(), m.bottom() + rows_below * GRID_ROW_HEIGHT)
+        self.grid_layout.addItem(self._grid_spacer, -(-end // columns), 0, 1, -1)
+        if end < target or start > first: QTimer.singleShot(0, self._fill_grid)
+
+    def _place_grid_item(self, i):
+        path = self._grid_items[i]
+        if self.current_view == 'folders':
+            image_paths = self.grouped_images[path]
+            if self._folder_pool:
+                widget = self._folder_pool.pop()
+                widget.reconfigure(path, image_paths), widget.show()
+            else: widget = FolderThumbnailWidget(path, image_paths, self)
+            self.folder_widgets[path] = widget
+        else:
+            if self._thumb_pool:
+                widget = self._thumb_pool.pop()
+                widget.reconfigure(path, self.image_names.get(path)), widget.show()
+            else: widget = ThumbnailWidget(path, self, self.image_names.get(path))
+            self.thumbnail_widgets[path] = widget
+        self.grid_layout.addWidget(widget, *divmod(i, self._grid_columns))
+
+    def _release_grid_item(self, i):
+        widget = (self.folder_widgets if self.current_view == 'folders' else self.thumbnail_widgets).pop(self._grid_items[i], None)
+        if widget is not None: self._recycle_grid_widget(widget)
+
+    def _recycle_grid_widget(self, widget):
+        """Mengeluarkan widget dari grid ke pool-nya; di atas GRID_POOL_MAX widget dihapus."""
+        self.grid_layout.removeWidget(widget), widget.hide()
+        pool = self._folder_pool if isinstance(widget, FolderThumbnailWidget) else self._thumb_pool
+        if len(pool) < GRID_POOL_MAX: pool.append(widget)
+        else: widget.deleteLater()
+
     def _get_filtered_and_sorted_list(self):
         image_paths = self._get_sorted_image_list()
         if self.current_filter_method == 'filter_all' or not self.current_filter_method:
             return image_paths
         
         filtered_paths = []
-        filter_type, _, filter_value = self.current_filter_method.partition('_')
-        
+        # Hitung jenis filter dan nilai yang dicari sekali saja, bukan per file
+        is_rating = self.current_filter_method.startswith('filter_rating')
+        is_color = self.current_filter_method.startswith('filter_color')
+        if not (is_rating or is_color):
+            return filtered_paths
+        wanted = self.current_filter_method.rpartition('_')[2]
+
         for path in image_paths:
             metadata = read_metadata(path)
-            if filter_type == 'filter' and filter_value.startswith('rating'):
-                rating = metadata.get('rating', 0)
-                if str(rating) == filter_value.split('_')[1]:
-                    filtered_paths.append(path)
-            elif filter_type == 'filter' and filter_value.startswith('color'):
-                color = metadata.get('label_color', 'none')
-                if color == filter_value.split('_')[1]:
+            if is_rating:
+                if str(metadata.get('rating', 0)) == wanted:
                     filtered_paths.append(path)
+            elif metadata.get('label_color', 'none') == wanted:
+                filtered_paths.append(path)
 
         return filtered_paths
 
@@ -932,6 +1666,7 @@ class MacanGallery(QMainWindow):
 
     def show_image_view(self, path, reload_from_disk=True):
         if reload_from_disk:
+            self._edit_gen += 1 # Preview slider yang masih berjalan untuk gambar lama tidak lagi berlaku
             self.current_image_list = self._get_filtered_and_sorted_list()
             if path in self.current_image_list:
                 self.current_image_index = self.current_image_list.index(path)
@@ -946,35 +1681,30 @@ class MacanGallery(QMainWindow):
             if reload_from_disk:
                 metadata = read_metadata(self.current_image_path)
                 edits = metadata.get('edits', {})
-                self.current_edits = {
-                    'brightness': edits.get('brightness', 0),
-                    'contrast': edits.get('contrast', 1.0),
-                    'saturation': edits.get('saturation', 1.0)
-                }
+                self.edit_brightness = edits.get('brightness', 0)
+                self.edit_contrast = edits.get('contrast', 1.0)
+                self.edit_saturation = edits.get('saturation', 1.0)
                 
                 # Update posisi slider agar sesuai dengan data yang tersimpan
                 self.brightness_slider.blockSignals(True)
                 self.contrast_slider.blockSignals(True)
                 self.saturation_slider.blockSignals(True)
-                self.brightness_slider.setValue(self.current_edits['brightness'])
-                self.contrast_slider.setValue(int(self.current_edits['contrast'] * 100))
-                self.saturation_slider.setValue(int(self.current_edits['saturation'] * 100))
+                self.brightness_slider.setValue(self.edit_brightness)
+                self.contrast_slider.setValue(int(self.edit_contrast * 100))
+                self.saturation_slider.setValue(int(self.edit_saturation * 100))
                 self.brightness_slider.blockSignals(False)
                 self.contrast_slider.blockSignals(False)
                 self.saturation_slider.blockSignals(False)
 
-                # Muat gambar asli dari disk dan simpan ke memori
-                cv_image = cv2.imread(self.current_image_path, cv2.IMREAD_COLOR) 
-                if cv_image is None: raise Exception("OpenCV failed to open the image file.")
-                self.original_cv_image = cv_image
+                # Muat gambar asli (dari cache decode jika ada) dan simpan ke memori
+                self.original_cv_image = self._load_original(self.current_image_path)
         
-            # Terapkan penyesuaian (baik yang tersimpan atau yang live) ke gambar asli
-            edited_image = self.apply_image_edits(self.original_cv_image, self.current_edits)
+            # Editan (tersimpan atau live) dirender di _edit_pool agar GUI tidak tertahan; sementara gambar asli ditampilkan
+            edited_image = self.original_cv_image
+            has_edits = (self.edit_brightness, self.edit_contrast, self.edit_saturation) != (0, 1.0, 1.0)
         
             h_orig, w_orig, *_ = edited_image.shape
-            bytes_per_line = 3 * w_orig
-            
-            qt_image = QImage(edited_image.data, w_orig, h_orig, bytes_per_line, QImage.Format.Format_BGR888)
+            qt_image = bgr_to_qimage(edited_image)
 
             if qt_image.isNull(): raise Exception("Failed to convert the OpenCV image to a QImage.")
             
@@ -983,7 +1713,10 @@ class MacanGallery(QMainWindow):
             if reload_from_disk:
                 self.original_pixmap_for_editing = pixmap.copy()
 
-            self.current_viewer_pixmap = pixmap
+            self._set_viewer_pixmap(pixmap, edited_image)
+            if has_edits:
+                self._render_image_edits()
+                self._saved_edits_gen = self._edit_gen
             
             size_bytes, file_ext = os.path.getsize(path), os.path.splitext(path)[1].upper().replace('.', '')
             self.image_res_label.setText(f"{w_orig}x{h_orig}")
@@ -994,16 +1727,59 @@ class MacanGallery(QMainWindow):
             self.viewer_label.setPixmap(QPixmap())
             self.main_stack.setCurrentIndex(1)
             self.toggle_info_action.setChecked(self.metadata_dock.isVisible())
-            self.load_exif_data(path)
+            if reload_from_disk:
+                self.load_exif_data(path) # EXIF tidak berubah saat preview slider
             self.update_tag_display()
             if reload_from_disk:
                 QTimer.singleShot(0, self.fit_image_to_window)
+                self._prefetch_neighbors()
             else:
                 self.update_zoom(self.zoom_slider.value())
             QTimer.singleShot(0, self._update_nav_buttons_position)
         except Exception as e:
             QMessageBox.critical(self, "Error Opening Image", f"Could not open image:\n{path}\n\nReason: {e}")
 
+    def _load_original(self, path):
+        """Decode gambar ke BGR dengan cache LRU (path, mtime_ns, size) berbatas DECODED_CACHE_MAX_BYTES.
+        Array di cache tidak boleh diubah in-place; semua tahap edit menghasilkan array baru."""
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        cv_image = self._decoded_cache.get(key)
+        if cv_image is not None:
+            self._decoded_cache.move_to_end(key)
+            return cv_image
+        cv_image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if cv_image is None: raise Exception("OpenCV failed to open the image file.")
+        self._remember_decoded(key, cv_image)
+        return cv_image
+
+    def _remember_decoded(self, key, cv_image):
+        self._decoded_cache[key] = cv_image
+        total_bytes = sum(a.nbytes for a in self._decoded_cache.values())
+        while len(self._decoded_cache) > 1 and total_bytes > DECODED_CACHE_MAX_BYTES:
+            _, evicted = self._decoded_cache.popitem(last=False)
+            total_bytes -= evicted.nbytes
+
+    def _prefetch_neighbors(self):
+        """Decode gambar tetangga di background ke _decoded_cache agar next/previous langsung tampil."""
+        images, n = self.current_image_list, len(self.current_image_list)
+        if n <= 1: return
+        # Semua I/O (fadvise, stat, decode) berjalan di _prefetch_pool, bukan di GUI thread saat navigasi
+        self._prefetch_pool.start(BackgroundTask(advise_willneed, {images[(self.current_image_index + offset) % n] for offset in READAHEAD_NEIGHBORS} - {self.current_image_path}))
+        for offset in PREFETCH_NEIGHBORS:
+            path = images[(self.current_image_index + offset) % n]
+            if path == self.current_image_path or path in self._prefetching: continue
+            cached_key = next((key for key in self._decoded_cache if key[0] == path), None) # Dicek ulang terhadap mtime di worker
+            self._prefetching.add(path)
+            task = BackgroundTask(decode_image_for_cache, path, cached_key)
+            task.signals.finished.connect(self._on_prefetch_ready)
+            task.signals.error.connect(lambda _msg, p=path: self._prefetching.discard(p)) # Gagal: viewer yang melaporkan saat dibuka
+            self._prefetch_pool.start(task)
+
+    def _on_prefetch_ready(self, result):
+        key, cv_image = result
+        self._prefetching.discard(key[0])
+        if cv_image is not None and key not in self._decoded_cache: self._remember_decoded(key, cv_image) # Mungkin sudah dimuat langsung oleh viewer
     def fit_image_to_window(self):
         if self.current_viewer_pixmap is None: return
         img_size, viewport_size = self.current_viewer_pixmap.size(), self.viewer_scroll_area.viewport().size()
@@ -1017,9 +1793,12 @@ class MacanGallery(QMainWindow):
     def show_gallery_view(self):
         if self.slideshow_timer.isActive(): self.toggle_slideshow()
         self.main_stack.setCurrentIndex(0)
-        self.current_viewer_pixmap = None
+        self._set_viewer_pixmap(None)
         self.original_pixmap_for_editing = None
         self.original_cv_image = None
+        self._scratch, self._preview_scratch = {}, {} # Diganti, bukan clear(): _build_edit_preview mungkin sedang memakainya
+        self._preview_source = (None, None, None)
+        self._edit_result_cache = OrderedDict() # Diganti, bukan clear(): worker mungkin sedang memakainya
         self.viewer_label.clear(), self.viewer_label.unsetCursor()
         self.prev_button.setVisible(False), self.next_button.setVisible(False)
         self.metadata_dock.setVisible(False)
@@ -1054,76 +1833,74 @@ class MacanGallery(QMainWindow):
     def show_about_dialog(self):
         QMessageBox.about(self, f"About {APP_NAME}", f"<b>{APP_NAME} v{APP_VERSION}</b><br><br>A professional, enterprise-grade gallery application built with Python, PySide6, and OpenCV.<br><br>©2025 {ORGANIZATION_NAME}")
                           
+    def _create_context_menus(self):
+        # Submenu rating/label dibuat sekali; tiap aksi membawa data dan dirutekan oleh satu slot
+        self._context_thumb_widget, self._context_path = None, None
+        rating_names = [f"{i} Stars" if i > 0 else "No Rating" for i in range(6)]
+        self._selected_rating_menu = QMenu("Set Rating for Selected", self)
+        self._selected_label_menu = QMenu("Set Label for Selected", self)
+        self._item_rating_menu = QMenu("Set Rating", self)
+        self._item_label_menu = QMenu("Set Label Color", self)
+        for menu, kind in ((self._selected_rating_menu, 'selected_rating'), (self._item_rating_menu, 'rating')):
+            for i, name in enumerate(rating_names): menu.addAction(name).setData((kind, i))
+        for menu, kind in ((self._selected_label_menu, 'selected_label'), (self._item_label_menu, 'label')):
+            for name, color_val in LABEL_COLORS: menu.addAction(name).setData((kind, color_val))
+        for menu in (self._selected_rating_menu, self._selected_label_menu, self._item_rating_menu, self._item_label_menu):
+            menu.triggered.connect(self._on_context_submenu_triggered)
+        # Menu konteks grid juga dibuat sekali; tiap klik kanan cukup mengatur aksi yang tampil dan _context_path.
+        # Separator yang berurutan/di ujung disembunyikan otomatis oleh QMenu.
+        menu = self._context_menu = QMenu(self)
+        self._selection_actions = [menu.addAction("Select All Visible", self.select_all_visible),
+                                   menu.addAction("Deselect All Visible", self.deselect_all_visible), menu.addSeparator()]
+        self._delete_selected_action = menu.addAction("Delete Selected", self.delete_selected_images)
+        self._selected_actions = [self._delete_selected_action, menu.addMenu(self._selected_rating_menu),
+                                  menu.addMenu(self._selected_label_menu), menu.addSeparator()]
+        self._file_actions = [menu.addMenu(self._item_rating_menu), menu.addMenu(self._item_label_menu), menu.addSeparator(),
+                              menu.addAction("Cut", lambda: self.file_op_cut(self._context_path)),
+                              menu.addAction("Copy (File Path)", lambda: self.file_op_copy(self._context_path)), menu.addSeparator(),
+                              menu.addAction("Delete (Move to Trash)", lambda: self.delete_single_image(self._context_path)), menu.addSeparator(),
+                              menu.addAction("File Info", lambda: self.show_file_info(self._context_path)),
+                              menu.addAction("Set as Wallpaper", lambda: self.set_as_wallpaper(self._context_path))]
+        self._paste_action = menu.addAction("Paste", lambda: self.file_op_paste(self._context_path))
+        self._folder_actions = [self._paste_action, menu.addSeparator(),
+                                menu.addAction("Remove from list", lambda: self.remove_folder_from_gallery(self._context_path))]
+
+    def _on_context_submenu_triggered(self, action):
+        kind, value = action.data()
+        if kind == 'selected_rating': self.set_rating_for_selected(value)
+        elif kind == 'selected_label': self.set_label_for_selected(value)
+        elif self._context_thumb_widget is not None:
+            if kind == 'rating': self.set_rating(self._context_thumb_widget, value)
+            elif kind == 'label': self.set_label_color(self._context_thumb_widget, value)
+
     def show_context_menu(self, pos):
         global_pos = self.grid_container.mapToGlobal(pos)
-        widget_at = self.childAt(self.grid_container.mapFromGlobal(global_pos))
-        thumb_widget = widget_at
-        while thumb_widget and not isinstance(thumb_widget, (ThumbnailWidget, FolderThumbnailWidget)): thumb_widget = thumb_widget.parent()
-
-        context_menu = QMenu(self)
-
-        # [PERUBAHAN] Tambahkan menu seleksi jika di view 'images'
-        if self.current_view == 'images':
-            select_all_action = context_menu.addAction("Select All Visible")
-            select_all_action.triggered.connect(self.select_all_visible)
-            deselect_all_action = context_menu.addAction("Deselect All Visible")
-            deselect_all_action.triggered.connect(self.deselect_all_visible)
-            context_menu.addSeparator()
-
-            if self.selected_files:
-                delete_selected_action = context_menu.addAction(f"Delete Selected ({len(self.selected_files)})")
-                delete_selected_action.triggered.connect(self.delete_selected_images)
-                
-                selected_rating_menu = context_menu.addMenu("Set Rating for Selected")
-                for i in range(6):
-                    action = selected_rating_menu.addAction(f"{i} Stars" if i > 0 else "No Rating")
-                    action.triggered.connect(partial(self.set_rating_for_selected, i))
-
-                selected_label_menu = context_menu.addMenu("Set Label for Selected")
-                colors = {"No Label": "none", "Red": "red", "Yellow": "yellow", "Green": "green", "Blue": "blue"}
-                for name, color_val in colors.items():
-                    action = selected_label_menu.addAction(name)
-                    action.triggered.connect(partial(self.set_label_for_selected, color_val))
-                
-                context_menu.addSeparator()
-        
-        if not thumb_widget: 
-            context_menu.exec(global_pos) # Tampilkan menu seleksi meskipun tidak klik item
-            return
-
-        if isinstance(thumb_widget, ThumbnailWidget):
-            self.status_label.setText(os.path.basename(thumb_widget.file_path))
-            rating_menu = context_menu.addMenu("Set Rating")
-            for i in range(6):
-                action = rating_menu.addAction(f"{i} Stars" if i > 0 else "No Rating")
-                action.triggered.connect(partial(self.set_rating, thumb_widget, i))
-            label_menu = context_menu.addMenu("Set Label Color")
-            colors = {"No Label": "none", "Red": "red", "Yellow": "yellow", "Green": "green", "Blue": "blue"}
-            for name, color_val in colors.items():
-                action = label_menu.addAction(name)
-                action.triggered.connect(partial(self.set_label_color, thumb_widget, color_val))
-            context_menu.addSeparator()
-            cut_action = context_menu.addAction("Cut")
-            cut_action.triggered.connect(lambda: self.file_op_cut(thumb_widget.file_path))
-            copy_action = context_menu.addAction("Copy (File Path)")
-            copy_action.triggered.connect(lambda: self.file_op_copy(thumb_widget.file_path))
-            context_menu.addSeparator()
-            delete_action = context_menu.addAction("Delete (Move to Trash)")
-            delete_action.triggered.connect(lambda: self.delete_single_image(thumb_widget.file_path))
-            context_menu.addSeparator()
-            file_info_action = context_menu.addAction("File Info")
-            file_info_action.triggered.connect(lambda: self.show_file_info(thumb_widget.file_path))
-            set_wallpaper_action = context_menu.addAction("Set as Wallpaper")
-            set_wallpaper_action.triggered.connect(lambda: self.set_as_wallpaper(thumb_widget.file_path))
-        elif isinstance(thumb_widget, FolderThumbnailWidget):
-             self.status_label.setText(os.path.basename(thumb_widget.folder_path))
-             paste_action = context_menu.addAction("Paste")
-             paste_action.setEnabled(bool(self.clipboard_cut_path))
-             paste_action.triggered.connect(lambda: self.file_op_paste(thumb_widget.folder_path))
-             context_menu.addSeparator()
-             remove_action = context_menu.addAction("Remove from list")
-             remove_action.triggered.connect(lambda: self.remove_folder_from_gallery(thumb_widget.folder_path))
-        context_menu.exec(global_pos)
+        # Hit test di grid_container sendiri (pos sudah koordinat container); naik paling jauh sampai container
+        thumb_widget = self.grid_container.childAt(pos)
+        while thumb_widget is not None and thumb_widget is not self.grid_container and not isinstance(thumb_widget, (ThumbnailWidget, FolderThumbnailWidget)):
+            thumb_widget = thumb_widget.parentWidget()
+        if thumb_widget is self.grid_container: thumb_widget = None
+
+        # [PERUBAHAN] Menu seleksi tampil di view 'images', meskipun tidak klik item
+        images_view = self.current_view == 'images'
+        has_selection = images_view and bool(self.selected_files)
+        for action in self._selection_actions: action.setVisible(images_view)
+        for action in self._selected_actions: action.setVisible(has_selection)
+        if has_selection: self._delete_selected_action.setText(f"Delete Selected ({len(self.selected_files)})")
+
+        is_file, is_folder = isinstance(thumb_widget, ThumbnailWidget), isinstance(thumb_widget, FolderThumbnailWidget)
+        for action in self._file_actions: action.setVisible(is_file)
+        for action in self._folder_actions: action.setVisible(is_folder)
+        if is_file:
+            # Path dibaca sekarang: widget bisa dipakai ulang pool grid untuk gambar lain
+            self._context_path, self._context_thumb_widget = thumb_widget.file_path, thumb_widget
+            self.status_label.setText(os.path.basename(self._context_path))
+        elif is_folder:
+            self._context_path = thumb_widget.folder_path
+            self.status_label.setText(os.path.basename(self._context_path))
+            self._paste_action.setEnabled(bool(self.clipboard_cut_path) and self.clipboard_cut_path not in self._moving)
+        self._context_menu.exec(global_pos)
+        self._context_thumb_widget, self._context_path = None, None
 
     # [TAMBAHAN] Fungsi baru untuk handle shortcut CTRL+A
     def select_all_visible_shortcut(self):
@@ -1133,13 +1910,21 @@ class MacanGallery(QMainWindow):
 
     # [PERUBAHAN] Fungsi baru untuk seleksi
     def select_all_visible(self):
-        for path, widget in self.thumbnail_widgets.items():
-            widget.select_check.setChecked(True)
-        self.update_selection_status()
+        self._set_visible_selection(True)
 
     def deselect_all_visible(self):
-        for path, widget in self.thumbnail_widgets.items():
-            widget.select_check.setChecked(False)
+        self._set_visible_selection(False)
+
+    def _set_visible_selection(self, checked):
+        """Mengubah checkbox semua thumbnail tanpa memicu signal per widget, lalu update set sekaligus."""
+        for widget in self.thumbnail_widgets.values():
+            widget.select_check.blockSignals(True)
+            widget.select_check.setChecked(checked)
+            widget.select_check.blockSignals(False)
+        # Termasuk item yang widget-nya belum dibuat karena belum di-scroll
+        paths = self._grid_items if self.current_view == 'images' else ()
+        if checked: self.selected_files.update(paths)
+        else: self.selected_files.difference_update(paths)
         self.update_selection_status()
     
     def delete_selected_images(self):
@@ -1152,43 +1937,46 @@ class MacanGallery(QMainWindow):
                                      QMessageBox.StandardButton.No)
         
         if reply == QMessageBox.StandardButton.Yes:
-            deleted_count = 0
-            for path in list(self.selected_files):
-                try:
-                    send2trash(os.path.normpath(path))
-                    meta_path = get_metadata_path(path)
-                    if os.path.exists(meta_path):
-                        send2trash(os.path.normpath(meta_path))
-                    self.selected_files.discard(path)
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"Failed to delete {path}: {e}")
-            
-            self.status_label.setText(f"Moved {deleted_count} item(s) to Trash.")
-            self.start_scanning_folders() # Ini akan clear selection dan reflow
+            # Sidecar yang masuk Trash sebaiknya versi terbaru; gagal menulis (mis. media read-only) tidak membatalkan hapus
+            failures = flush_metadata_writes(self.selected_files)
+            metadata_error = f" ({describe_metadata_failures(failures)})" if failures else ""
+            # Hapus di background agar UI tidak freeze untuk seleksi besar
+            task = BackgroundTask(move_images_to_trash, list(self.selected_files))
+            task.signals.finished.connect(self.on_selected_images_deleted)
+            task.signals.error.connect(lambda msg: QMessageBox.critical(self, "Error", f"Failed to delete files: {msg}"))
+            self.status_label.setText(f"Moving {count} item(s) to Trash...{metadata_error}")
+            QThreadPool.globalInstance().start(task)
+
+    def on_selected_images_deleted(self, deleted_paths):
+        for path in deleted_paths:
+            self.selected_files.discard(path)
+        self.status_label.setText(f"Moved {len(deleted_paths)} item(s) to Trash.")
+        QTimer.singleShot(0, self.start_scanning_folders) # Ini akan clear selection dan reflow
 
     def set_rating_for_selected(self, rating):
         if not self.selected_files: return
-        for path in self.selected_files:
-            write_metadata(path, {'rating': rating})
-            if path in self.thumbnail_widgets:
-                self.thumbnail_widgets[path].update_metadata_display()
+        updated = batch_write_metadata({path: {'rating': rating} for path in self.selected_files})
+        QTimer.singleShot(0, partial(self._refresh_thumbnail_metadata, updated))
         self.status_label.setText(f"Set rating for {len(self.selected_files)} item(s).")
                 
     def set_label_for_selected(self, color):
         if not self.selected_files: return
-        for path in self.selected_files:
-            if color == 'none':
-                meta = read_metadata(path)
-                meta.pop('label_color', None)
-                write_metadata(path, meta)
-            else:
-                write_metadata(path, {'label_color': color})
-            
-            if path in self.thumbnail_widgets:
-                self.thumbnail_widgets[path].update_metadata_display()
+        label_color = None if color == 'none' else color
+        updated = batch_write_metadata({path: {'label_color': label_color} for path in self.selected_files})
+        QTimer.singleShot(0, partial(self._refresh_thumbnail_metadata, updated))
         self.status_label.setText(f"Set label for {len(self.selected_files)} item(s).")
 
+    def _refresh_thumbnail_metadata(self, metadata_by_path):
+        """Memperbarui tampilan rating/label thumbnail memakai metadata yang baru ditulis."""
+        # Satu repaint untuk seluruh grid, bukan satu per thumbnail
+        self.grid_container.setUpdatesEnabled(False)
+        try:
+            for path, metadata in metadata_by_path.items():
+                if path in self.thumbnail_widgets:
+                    self.thumbnail_widgets[path].update_metadata_display(metadata)
+        finally:
+            self.grid_container.setUpdatesEnabled(True)
+
     def file_op_cut(self, path):
         self.clipboard_cut_path = path
         self.status_label.setText(f"Cut: {os.path.basename(path)}")
@@ -1198,19 +1986,26 @@ class MacanGallery(QMainWindow):
         self.status_label.setText(f"Copied path: {os.path.basename(path)}")
 
     def file_op_paste(self, dest_folder):
-        if not self.clipboard_cut_path: return
+        if not self.clipboard_cut_path or self.clipboard_cut_path in self._moving: return # Paste kedua selama move berjalan
         source_path, filename = self.clipboard_cut_path, os.path.basename(self.clipboard_cut_path)
         dest_path = os.path.join(dest_folder, filename)
         if source_path == dest_path: self.clipboard_cut_path = None; return
-        try:
-            shutil.move(source_path, dest_path)
-            meta_source = get_metadata_path(source_path)
-            if os.path.exists(meta_source):
-                shutil.move(meta_source, get_metadata_path(dest_path))
-            self.status_label.setText(f"Moved {filename} to {dest_folder}")
-            self.clipboard_cut_path = None
-            QTimer.singleShot(100, self.start_scanning_folders)
-        except Exception as e: QMessageBox.critical(self, "Paste Error", f"Could not move file:\n{e}")
+        failures = flush_metadata_writes([source_path]) # Update yang antre ditulis dulu agar ikut dipindah
+        if failures: QMessageBox.critical(self, "Paste Error", f"Could not move file:\n{failures[source_path]}"); return
+        # Pindah antar drive berarti copy penuh; jalankan di background agar UI tidak freeze.
+        # Clipboard cut baru dikosongkan setelah berhasil, agar bisa dicoba lagi jika gagal
+        task = BackgroundTask(move_image_with_metadata, source_path, dest_path)
+        task.signals.finished.connect(lambda _: self._on_paste_finished(source_path, filename, dest_folder))
+        task.signals.error.connect(lambda msg: (self._moving.discard(source_path), QMessageBox.critical(self, "Paste Error", f"Could not move file:\n{msg}")))
+        self._moving.add(source_path)
+        self.status_label.setText(f"Moving {filename}...")
+        QThreadPool.globalInstance().start(task)
+
+    def _on_paste_finished(self, source_path, filename, dest_folder):
+        self._moving.discard(source_path)
+        if self.clipboard_cut_path == source_path: self.clipboard_cut_path = None # Selama memindah, user mungkin sudah cut file lain
+        self.status_label.setText(f"Moved {filename} to {dest_folder}")
+        self._rescan_timer.start()
 
     def remove_folder_from_gallery(self, folder_path):
         folders = self.settings.value("gallery_folders", [], type=list)
@@ -1222,29 +2017,68 @@ class MacanGallery(QMainWindow):
 
     def show_file_info(self, file_path):
         try:
-            stat_info, size_bytes = os.stat(file_path), os.stat(file_path).st_size
-            img = cv2.imread(file_path)
-            if img is None: raise IOError()
-            h, w, *_ = img.shape
-            info_text = (f"<b>Filename:</b> {os.path.basename(file_path)}<br>"
-                         f"<b>Path:</b> {os.path.dirname(file_path)}<br>"
+            st = os.stat(file_path)
+            size_bytes = st.st_size
+            w, h = get_image_dimensions(file_path, st.st_mtime_ns, size_bytes)
+            folder, file_name = os.path.split(file_path)
+            info_text = (f"<b>Filename:</b> {file_name}<br>"
+                         f"<b>Path:</b> {folder}<br>"
                          f"<b>Dimensions:</b> {w} x {h} pixels<br>"
                          f"<b>File Size:</b> {get_human_readable_size(size_bytes)} ({size_bytes:,} bytes)")
             QMessageBox.information(self, "File Info", info_text)
         except Exception: QMessageBox.critical(self, "Error", f"Could not get file info for:\n{file_path}")
             
     def set_as_wallpaper(self, file_path):
-        path, system = os.path.abspath(file_path), platform.system()
-        try:
-            if system == "Windows": ctypes.windll.user32.SystemParametersInfoW(20, 0, path, 3)
-            elif system == "Darwin": subprocess.run(f'osascript -e \'tell application "Finder" to set desktop picture to POSIX file "{path}"\'', shell=True, check=True)
-            else: subprocess.run(["gsettings", "set", "org.gnome.desktop.background", "picture-uri", f"file://{path}"], check=True)
-            self.status_label.setText("Wallpaper set successfully.")
-        except Exception as e: QMessageBox.critical(self, "Set Wallpaper Error", f"Failed to set wallpaper:\n{e}")
+        # Desktop bisa butuh ratusan ms untuk memuat ulang wallpaper; jangan tahan event loop
+        screen_size = self.screen().size() * self.screen().devicePixelRatio() # Piksel fisik
+        task = BackgroundTask(set_wallpaper, os.path.abspath(file_path), screen_size.width(), screen_size.height())
+        task.signals.finished.connect(lambda _: self.status_label.setText("Wallpaper set successfully."))
+        task.signals.error.connect(lambda msg: QMessageBox.critical(self, "Set Wallpaper Error", f"Failed to set wallpaper:\n{msg}"))
+        self.status_label.setText("Setting wallpaper...")
+        QThreadPool.globalInstance().start(task)
+
+    def _schedule_zoom(self, value):
+        self.zoom_label.setText(f"{value}%")
+        self._zoom_debounce.start()
+
+    def _on_zoom_slider_pressed(self): self._zoom_dragging = True
+
+    def _on_zoom_slider_released(self):
+        self._zoom_dragging = False
+        self.update_zoom(self.zoom_slider.value())
+
+    def _set_viewer_pixmap(self, pixmap, source_array=None):
+        """Mengganti pixmap viewer dan membuang cache zoom milik pixmap lama.
+        source_array (BGR, isi sama dengan pixmap) opsional; dipakai untuk zoom-out besar lewat cv2."""
+        self.current_viewer_pixmap, self._viewer_array = pixmap, source_array
+        self._zoom_cache.clear()
+
+    def _get_scaled_viewer_pixmap(self, value, fast=False):
+        scaled_pixmap = self._zoom_cache.get(value)
+        if scaled_pixmap is not None:
+            self._zoom_cache.move_to_end(value)
+            return scaled_pixmap
+        if fast: # Hasil sementara (nearest-neighbour), tidak disimpan di cache
+            return self.current_viewer_pixmap.scaled(self.current_viewer_pixmap.size() * (value / 100.0), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.FastTransformation)
+        target = self.current_viewer_pixmap.size() * (value / 100.0)
+        if self._viewer_array is not None and value <= 50 and not target.isEmpty():
+            # Perkecil >= 2x: INTER_AREA OpenCV (rata-rata area, SIMD) lebih cepat dan tidak aliasing dibanding bilinear Qt
+            scaled_array = cv2.resize(self._viewer_array, (target.width(), target.height()), interpolation=cv2.INTER_AREA)
+            scaled_pixmap = QPixmap.fromImage(bgr_to_qimage(scaled_array)) # fromImage menyalin, scaled_array boleh dibuang setelahnya
+        else:
+            scaled_pixmap = self.current_viewer_pixmap.scaled(target, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        self._zoom_cache[value] = scaled_pixmap
+        # Batasi jumlah entri dan total memori (zoom besar pada foto besar bisa ratusan MB)
+        total_bytes = sum(p.width() * p.height() * 4 for p in self._zoom_cache.values())
+        while len(self._zoom_cache) > 1 and (len(self._zoom_cache) > ZOOM_CACHE_MAX_ENTRIES or total_bytes > ZOOM_CACHE_MAX_BYTES):
+            _, evicted = self._zoom_cache.popitem(last=False)
+            total_bytes -= evicted.width() * evicted.height() * 4
+        return scaled_pixmap
 
     def update_zoom(self, value):
+        self._zoom_debounce.stop() # Panggilan langsung sudah memakai nilai terbaru
         if self.current_viewer_pixmap is None: return
-        scaled_pixmap = self.current_viewer_pixmap.scaled(self.current_viewer_pixmap.size() * (value / 100.0), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        scaled_pixmap = self._get_scaled_viewer_pixmap(value, fast=self._zoom_dragging or self._zoom_settle.isActive())
         self.viewer_label.setPixmap(scaled_pixmap)
         self.viewer_label.adjustSize()
         self.zoom_label.setText(f"{value}%")
@@ -1259,41 +2093,49 @@ class MacanGallery(QMainWindow):
                 self.viewer_label.setCursor(Qt.CursorShape.OpenHandCursor)
             else: self.viewer_label.unsetCursor()
     
+    # Tipe event di-cache di level kelas; eventFilter dipanggil untuk setiap mouse move saat pan
+    _EV_MOUSE_PRESS, _EV_MOUSE_RELEASE = QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease
+    _EV_MOUSE_MOVE, _EV_WHEEL = QEvent.Type.MouseMove, QEvent.Type.Wheel
+    _LEFT_BUTTON = Qt.MouseButton.LeftButton
+
     def eventFilter(self, source, event):
         # [MODIFIKASI] Tambahkan blok 'elif' baru untuk WheelEvent
-        if source is self.viewer_label and self.current_viewer_pixmap:
-            if event.type() == QEvent.Type.MouseButtonPress and event.button() == Qt.MouseButton.LeftButton:
-                if self.viewer_label.cursor().shape() == Qt.CursorShape.OpenHandCursor:
-                    self.is_panning, self.pan_last_mouse_pos = True, event.globalPosition().toPoint()
-                    self.viewer_label.setCursor(Qt.CursorShape.ClosedHandCursor)
-                    return True
-            elif event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
-                if self.is_panning: self.is_panning = False; self._update_pan_cursor(); return True
-            elif event.type() == QEvent.Type.MouseMove and self.is_panning:
-                delta = event.globalPosition().toPoint() - self.pan_last_mouse_pos
-                self.pan_last_mouse_pos = event.globalPosition().toPoint()
-                h_bar, v_bar = self.viewer_scroll_area.horizontalScrollBar(), self.viewer_scroll_area.verticalScrollBar()
-                h_bar.setValue(h_bar.value() - delta.x())
-                v_bar.setValue(v_bar.value() - delta.y())
-                return True
-                
-            # [TAMBAHAN] Logika untuk Zoom dengan Mouse Wheel
-            elif event.type() == QEvent.Type.Wheel:
-                # Tentukan seberapa besar step zoom
-                # (angleDelta() biasanya 120 per "klik" scroll)
-                num_degrees = event.angleDelta().y() / 8
-                num_steps = num_degrees / 15  # default 120 / 8 / 15 = 1 step
-                
-                zoom_step_amount = 5 # Zoom 5% per "klik" scroll
-                
-                if num_steps > 0:
-                    self.zoom_slider.setValue(self.zoom_slider.value() + zoom_step_amount)
-                else:
-                    self.zoom_slider.setValue(self.zoom_slider.value() - zoom_step_amount)
-                    
-                event.accept()
+        if source is not self.viewer_label or not self.current_viewer_pixmap: return super().eventFilter(source, event)
+        t = event.type()
+        if t == self._EV_MOUSE_MOVE:
+            if not self.is_panning: return super().eventFilter(source, event)
+            pos = event.globalPosition().toPoint()
+            delta, self.pan_last_mouse_pos = pos - self.pan_last_mouse_pos, pos
+            sa = self.viewer_scroll_area
+            h_bar, v_bar = sa.horizontalScrollBar(), sa.verticalScrollBar()
+            h_bar.setValue(h_bar.value() - delta.x())
+            v_bar.setValue(v_bar.value() - delta.y())
+            return True
+        elif t == self._EV_MOUSE_PRESS and event.button() == self._LEFT_BUTTON:
+            lbl = self.viewer_label
+            if lbl.cursor().shape() == Qt.CursorShape.OpenHandCursor:
+                self.is_panning, self.pan_last_mouse_pos = True, event.globalPosition().toPoint()
+                lbl.setCursor(Qt.CursorShape.ClosedHandCursor)
                 return True
-                    
+        elif t == self._EV_MOUSE_RELEASE and event.button() == self._LEFT_BUTTON:
+            if self.is_panning: self.is_panning = False; self._update_pan_cursor(); return True
+
+        # [TAMBAHAN] Logika untuk Zoom dengan Mouse Wheel
+        elif t == self._EV_WHEEL:
+            # Tentukan seberapa besar step zoom
+            # (angleDelta() biasanya 120 per "klik" scroll)
+            num_degrees = event.angleDelta().y() / 8
+            num_steps = num_degrees / 15  # default 120 / 8 / 15 = 1 step
+
+            zoom_step_amount = 5 # Zoom 5% per "klik" scroll
+            self._zoom_settle.start()
+
+            slider = self.zoom_slider
+            slider.setValue(slider.value() + (zoom_step_amount if num_steps > 0 else -zoom_step_amount))
+
+            event.accept()
+            return True
+
         return super().eventFilter(source, event)
 
     def set_rating(self, widget, rating):
@@ -1301,12 +2143,7 @@ class MacanGallery(QMainWindow):
         widget.update_metadata_display()
 
     def set_label_color(self, widget, color):
-        if color == 'none':
-            meta = read_metadata(widget.file_path)
-            meta.pop('label_color', None)
-            write_metadata(widget.file_path, meta)
-        else:
-            write_metadata(widget.file_path, {'label_color': color})
+        write_metadata(widget.file_path, {'label_color': None if color == 'none' else color})
         widget.update_metadata_display()
 
     def delete_single_image(self, path):
@@ -1315,6 +2152,9 @@ class MacanGallery(QMainWindow):
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
+            # Sama dengan Delete Selected: sidecar yang gagal diperbarui tidak membatalkan hapus
+            failures = flush_metadata_writes([path])
+            metadata_error = f" ({describe_metadata_failures(failures)})" if failures else ""
             try:
                 normalized_path = os.path.normpath(path)
                 send2trash(normalized_path)
@@ -1327,7 +2167,7 @@ class MacanGallery(QMainWindow):
                     normalized_meta_path = os.path.normpath(meta_path)
                     send2trash(normalized_meta_path)
                     
-                self.status_label.setText(f"Moved '{os.path.basename(path)}' to Trash.")
+                self.status_label.setText(f"Moved '{os.path.basename(path)}' to Trash.{metadata_error}")
                 self.start_scanning_folders() # Ini akan refresh UI
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to delete file: {e}")
@@ -1346,31 +2186,31 @@ class MacanGallery(QMainWindow):
             self.show_gallery_view()
 
     def load_exif_data(self, path):
+        """Membaca EXIF di background; hasilnya diterapkan di _on_exif_ready."""
         try:
-            img = Image.open(path)
-            exif_data_raw = img.getexif()
-            if not exif_data_raw:
-                self.metadata_viewer.setHtml("<b>No EXIF data found.</b>")
-                return
-
-            exif_data = {TAGS.get(tag, tag): value for tag, value in exif_data_raw.items()}
-            
-            html = "<style>td { padding: 2px 5px; }</style><table>"
-            display_tags = ['Model', 'Make', 'DateTimeOriginal', 'ExposureTime', 'FNumber', 'ISOSpeedRatings', 'FocalLength', 'LensModel']
-            
-            for tag in display_tags:
-                if tag in exif_data:
-                    value = exif_data[tag]
-                    if isinstance(value, bytes):
-                        value = value.decode(errors='ignore')
-                    html += f"<tr><td><b>{tag}</b></td><td>{value}</td></tr>"
-
-            html += "</table>"
+            st = os.stat(path)
+            cache_key = (path, st.st_mtime_ns, st.st_size) # File yang ditimpa otomatis dapat key baru
+        except OSError:
+            cache_key = None
+        cached_html = self._exif_cache.get(cache_key)
+        if cached_html is not None:
+            self._exif_cache.move_to_end(cache_key)
+            self.metadata_viewer.setHtml(cached_html)
+            return
+        self.metadata_viewer.setHtml("<i>Loading EXIF data...</i>")
+        task = BackgroundTask(build_exif_html, path)
+        task.signals.finished.connect(partial(self._on_exif_ready, cache_key))
+        self._exif_pool.start(task)
+
+    def _on_exif_ready(self, cache_key, result):
+        path, html = result
+        if cache_key is not None:
+            self._exif_cache[cache_key] = html
+            while len(self._exif_cache) > EXIF_CACHE_MAX_ENTRIES: self._exif_cache.popitem(last=False)
+        # Abaikan hasil untuk gambar yang sudah ditinggalkan user
+        if path == self.current_image_path:
             self.metadata_viewer.setHtml(html)
 
-        except Exception as e:
-            self.metadata_viewer.setHtml(f"<b>Could not read EXIF data.</b><br><br>Reason: {e}")
-
     def toggle_info_panel(self):
         self.metadata_dock.setVisible(not self.metadata_dock.isVisible())
         self.toggle_info_action.setChecked(self.metadata_dock.isVisible())
@@ -1399,16 +2239,21 @@ class MacanGallery(QMainWindow):
     
     def rotate_image(self, angle):
         if self.original_pixmap_for_editing is None: return
+        self._edit_gen += 1 # Render editan yang belum selesai tidak boleh menimpa hasil transformasi
         transform = QTransform().rotate(angle)
         self.original_pixmap_for_editing = self.original_pixmap_for_editing.transformed(transform, Qt.TransformationMode.SmoothTransformation)
-        self.current_viewer_pixmap = self.original_pixmap_for_editing
+        if self.original_cv_image is not None and angle % 90 == 0 and angle % 360:
+            self.original_cv_image = cv2.rotate(self.original_cv_image, {90: cv2.ROTATE_90_CLOCKWISE, 180: cv2.ROTATE_180, 270: cv2.ROTATE_90_COUNTERCLOCKWISE}[angle % 360])
+        self._set_viewer_pixmap(self.original_pixmap_for_editing)
         self.update_zoom(self.zoom_slider.value())
         self._save_image_changes_overwrite()
 
     def flip_image(self, direction):
         if self.original_pixmap_for_editing is None: return
+        self._edit_gen += 1 # Render editan yang belum selesai tidak boleh menimpa hasil transformasi
         self.original_pixmap_for_editing = self.original_pixmap_for_editing.transformed(QTransform().scale(-1 if direction == 'h' else 1, -1 if direction == 'v' else 1))
-        self.current_viewer_pixmap = self.original_pixmap_for_editing
+        if self.original_cv_image is not None: self.original_cv_image = cv2.flip(self.original_cv_image, 1 if direction == 'h' else 0)
+        self._set_viewer_pixmap(self.original_pixmap_for_editing)
         self.update_zoom(self.zoom_slider.value())
         self._save_image_changes_overwrite()
     
@@ -1418,10 +2263,20 @@ class MacanGallery(QMainWindow):
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                      QMessageBox.StandardButton.Yes)
         if reply == QMessageBox.StandardButton.Yes:
+            path = self.current_image_path
+            # Kunci cache lama (mtime sebelum disimpan) dicatat dulu agar filenya bisa dihapus setelah dibuat ulang
+            stale_cache_path = self.thumbnail_cache_paths.pop(path, None) or get_thumbnail_cache_path(path)
+            folder_image_paths = self.grouped_images.get(os.path.dirname(path))
+            if not folder_image_paths or path not in folder_image_paths[:FOLDER_PREVIEW_COUNT]: folder_image_paths = None # Komposit folder tidak memuat gambar ini
+            stale_composite_path = get_folder_composite_cache_path(folder_image_paths) if folder_image_paths else None
             try:
-                self.original_pixmap_for_editing.save(self.current_image_path, quality=95)
-                self.status_label.setText(f"Saved changes to {os.path.basename(self.current_image_path)}")
-                self.original_cv_image = cv2.imread(self.current_image_path, cv2.IMREAD_COLOR)
+                if not self.original_pixmap_for_editing.save(path, quality=95): raise IOError("Image could not be written")
+                self.status_label.setText(f"Saved changes to {os.path.basename(path)}")
+                self.settings.remove("cache_stats") # refresh_thumbnail menulis dan menghapus file cache
+                task = BackgroundTask(refresh_thumbnail, path, stale_cache_path, folder_image_paths, stale_composite_path)
+                task.signals.finished.connect(self._on_thumbnail_refreshed)
+                task.signals.error.connect(lambda msg: self.status_label.setText(f"Thumbnail update failed: {msg}"))
+                QThreadPool.globalInstance().start(task)
             except Exception as e:
                 QMessageBox.critical(self, "Save Error", f"Could not save changes to file: {e}")
                 self.show_image_view(self.current_image_path, reload_from_disk=True)
@@ -1431,24 +2286,24 @@ class MacanGallery(QMainWindow):
     def toggle_maximize_restore(self):
         if self.isMaximized():
             self.showNormal()
-            self.maximize_action.setIcon(self._create_svg_icon('<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><rect x="3" y="3" width="18" height="18" rx="2" ry="2"></rect></svg>'))
+            self.maximize_action.setIcon(self._maximize_icon)
         else:
             self.showMaximized()
-            self.maximize_action.setIcon(self._create_svg_icon(self.restore_svg))
+            self.maximize_action.setIcon(self._restore_icon)
+    _EDGE_MARGIN = 8
+    # Kursor per zona 3x3 (kiri/tengah/kanan x atas/tengah/bawah), indeks = kolom + 3 * baris
+    _EDGE_CURSORS = (Qt.CursorShape.SizeFDiagCursor, Qt.CursorShape.SizeVerCursor, Qt.CursorShape.SizeBDiagCursor,
+                     Qt.CursorShape.SizeHorCursor, None, Qt.CursorShape.SizeHorCursor,
+                     Qt.CursorShape.SizeBDiagCursor, Qt.CursorShape.SizeVerCursor, Qt.CursorShape.SizeFDiagCursor)
+    # Zona yang menggeser sisi atas/bawah dan kiri/kanan; dibuat sekali, bukan tuple baru tiap mouse move
+    _VERTICAL_EDGES = frozenset({Qt.CursorShape.SizeVerCursor, Qt.CursorShape.SizeFDiagCursor, Qt.CursorShape.SizeBDiagCursor})
+    _HORIZONTAL_EDGES = frozenset({Qt.CursorShape.SizeHorCursor, Qt.CursorShape.SizeFDiagCursor, Qt.CursorShape.SizeBDiagCursor})
+
     def get_edge(self, pos):
-        rect, margin = self.rect(), 8
         if self.isMaximized(): return None
-        if pos.y() < margin:
-            if pos.x() < margin: return Qt.CursorShape.SizeFDiagCursor
-            if pos.x() > rect.right() - margin: return Qt.CursorShape.SizeBDiagCursor
-            return Qt.CursorShape.SizeVerCursor
-        if pos.y() > rect.bottom() - margin:
-            if pos.x() < margin: return Qt.CursorShape.SizeBDiagCursor
-            if pos.x() > rect.right() - margin: return Qt.CursorShape.SizeFDiagCursor
-            return Qt.CursorShape.SizeVerCursor
-        if pos.x() < margin: return Qt.CursorShape.SizeHorCursor
-        if pos.x() > rect.right() - margin: return Qt.CursorShape.SizeHorCursor
-        return None
+        x, y, margin = pos.x(), pos.y(), self._EDGE_MARGIN
+        right, bottom = self._edge_bounds # Dihitung ulang di resizeEvent, bukan per mouse move
+        return self._EDGE_CURSORS[(0 if x < margin else 2 if x > right else 1) + 3 * (0 if y < margin else 2 if y > bottom else 1)]
     def mousePressEvent(self, event):
         self.old_pos, self.is_resizing = None, False
         if event.button() == Qt.MouseButton.LeftButton:
@@ -1462,29 +2317,46 @@ class MacanGallery(QMainWindow):
 
     def mouseMoveEvent(self, event):
         pos = event.position().toPoint()
-        if hasattr(self, 'is_resizing') and self.is_resizing and self.old_pos:
-            delta = event.globalPosition().toPoint() - self.old_pos
-            self.old_pos, geom = event.globalPosition().toPoint(), self.geometry()
-            if self.resize_edge in (Qt.CursorShape.SizeVerCursor, Qt.CursorShape.SizeFDiagCursor, Qt.CursorShape.SizeBDiagCursor):
+        if self.is_resizing and self.old_pos:
+            global_pos = event.globalPosition().toPoint() # Sekali per event, bukan per pemakaian
+            delta = global_pos - self.old_pos
+            # Lanjutkan dari geometri yang belum diterapkan agar delta tidak hilang saat digabung
+            self.old_pos, geom = global_pos, self._pending_geom or self.geometry()
+            if self.resize_edge in self._VERTICAL_EDGES:
                 if pos.y() < 8: geom.setTop(geom.top() + delta.y())
                 else: geom.setBottom(geom.bottom() + delta.y())
-            if self.resize_edge in (Qt.CursorShape.SizeHorCursor, Qt.CursorShape.SizeFDiagCursor, Qt.CursorShape.SizeBDiagCursor):
+            if self.resize_edge in self._HORIZONTAL_EDGES:
                 if pos.x() < 8: geom.setLeft(geom.left() + delta.x())
                 else: geom.setRight(geom.right() + delta.x())
-            self.setGeometry(geom), event.accept()
-        elif event.buttons() == Qt.MouseButton.LeftButton and hasattr(self, 'old_pos') and self.old_pos:
-            delta = event.globalPosition().toPoint() - self.old_pos
-            self.move(self.x() + delta.x(), self.y() + delta.y())
-            self.old_pos = event.globalPosition().toPoint()
+            if self._pending_geom is None: QTimer.singleShot(0, self._apply_pending_geom)
+            self._pending_geom = geom
             event.accept()
-        else:
+        elif event.buttons() == Qt.MouseButton.LeftButton and self.old_pos:
+            global_pos = event.globalPosition().toPoint()
+            delta = global_pos - self.old_pos
+            self.old_pos = global_pos
+            if self._pending_pos is None: origin = self.pos(); QTimer.singleShot(0, self._apply_pending_geom)
+            else: origin = self._pending_pos # QPoint(0, 0) bernilai False, jadi jangan pakai 'or'
+            self._pending_pos = origin + delta
+            event.accept()
+        elif event.buttons() == Qt.MouseButton.NoButton: # Saat tombol ditekan kursor tidak berubah
             edge = self.get_edge(pos)
-            if edge: self.setCursor(QCursor(edge))
-            else: self.unsetCursor()
+            if edge != self._hover_edge: # Kursor hanya diganti saat zona berubah
+                self._hover_edge = edge
+                if edge: self.setCursor(self._edge_cursors[edge])
+                else: self.unsetCursor()
         super().mouseMoveEvent(event)    
     
+    def _apply_pending_geom(self):
+        """Menerapkan geometri resize/posisi drag terakhir; semburan mouse move digabung jadi satu setGeometry/move per giliran event loop."""
+        geom, self._pending_geom = self._pending_geom, None
+        if geom is not None: self.setGeometry(geom)
+        pos, self._pending_pos = self._pending_pos, None
+        if pos is not None: self.move(pos)
+
     def mouseReleaseEvent(self, event):
-        self.old_pos, self.is_resizing, self.resize_edge = None, False, None
+        self._apply_pending_geom()
+        self.old_pos, self.is_resizing, self.resize_edge, self._hover_edge = None, False, None, None
         self.unsetCursor(), super().mouseReleaseEvent(event)
 
     def mouseDoubleClickEvent(self, event):
@@ -1511,14 +2383,14 @@ class MacanGallery(QMainWindow):
     
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        self._edge_bounds = (self.width() - 1 - self._EDGE_MARGIN, self.height() - 1 - self._EDGE_MARGIN) # rect().right()/bottom() - margin
         if not hasattr(self, 'resize_timer'):
             self.resize_timer = QTimer()
             self.resize_timer.setSingleShot(True)
-            self.resize_timer.timeout.connect(self.reflow_ui)
+            self.resize_timer.timeout.connect(self._on_resize_settled)
         self.resize_timer.start(100)
         if self.main_stack.currentIndex() == 1:
-             self._update_nav_buttons_position()
-             if self.current_viewer_pixmap: self.update_zoom(self.zoom_slider.value())
+             self._update_nav_buttons_position() # Pixmap viewer disegarkan sekali setelah resize selesai (_on_resize_settled)
 
     def _create_info_dock_widget(self):
         """Menciptakan dock widget untuk info, edit, dan tag."""
@@ -1534,25 +2406,36 @@ class MacanGallery(QMainWindow):
         edit_label = QLabel("<b>Image Adjustments</b>")
         dock_layout.addWidget(edit_label)
 
+        # Timer untuk menggabungkan event slider, hanya nilai terakhir yang diproses
+        self._edits_debounce = QTimer(self)
+        self._edits_debounce.setSingleShot(True)
+        self._edits_debounce.setInterval(33)
+        self._edits_debounce.timeout.connect(partial(self._render_image_edits, True))
+        # Setelah slider diam, render sekali lagi pada resolusi penuh (preview selama drag memakai ukuran tampilan)
+        self._edits_settle = QTimer(self)
+        self._edits_settle.setSingleShot(True)
+        self._edits_settle.setInterval(300)
+        self._edits_settle.timeout.connect(self._render_image_edits)
+
         dock_layout.addWidget(QLabel("Brightness"))
         self.brightness_slider = QSlider(Qt.Orientation.Horizontal)
         self.brightness_slider.setRange(-100, 100)
         self.brightness_slider.setValue(0)
-        self.brightness_slider.valueChanged.connect(self.update_image_edits)
+        self.brightness_slider.valueChanged.connect(self._schedule_image_edits)
         dock_layout.addWidget(self.brightness_slider)
 
         dock_layout.addWidget(QLabel("Contrast"))
         self.contrast_slider = QSlider(Qt.Orientation.Horizontal)
         self.contrast_slider.setRange(0, 200)
         self.contrast_slider.setValue(100)
-        self.contrast_slider.valueChanged.connect(self.update_image_edits)
+        self.contrast_slider.valueChanged.connect(self._schedule_image_edits)
         dock_layout.addWidget(self.contrast_slider)
 
         dock_layout.addWidget(QLabel("Saturation"))
         self.saturation_slider = QSlider(Qt.Orientation.Horizontal)
         self.saturation_slider.setRange(0, 200)
         self.saturation_slider.setValue(100)
-        self.saturation_slider.valueChanged.connect(self.update_image_edits)
+        self.saturation_slider.valueChanged.connect(self._schedule_image_edits)
         dock_layout.addWidget(self.saturation_slider)
     
         edit_buttons_layout = QHBoxLayout()
@@ -1573,6 +2456,8 @@ class MacanGallery(QMainWindow):
         self.tag_display_layout = QVBoxLayout(self.tag_container)
         self.tag_display_layout.setContentsMargins(0,0,0,0)
         self.tag_display_layout.setSpacing(5)
+        self.tag_display_layout.addStretch() # Selalu item terakhir; widget tag disisipkan di depannya
+        self._tag_widgets = {} # tag -> QFrame yang sedang tampil
         
         tag_scroll_area = QScrollArea()
         tag_scroll_area.setWidgetResizable(True)
@@ -1604,50 +2489,118 @@ class MacanGallery(QMainWindow):
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.metadata_dock)
         self.metadata_dock.setVisible(False)
 
-    def apply_image_edits(self, cv_image, edits):
+    def apply_image_edits(self, cv_image, brightness=0, contrast=1.0, saturation=1.0, scratch=None):
         """
         Menerapkan editan (brightness, contrast, saturation) ke gambar OpenCV
-        dengan metode yang lebih robust.
+        dengan metode yang lebih robust. Hasil tidak pernah berupa buffer scratch; tanpa editan,
+        cv_image sendiri dikembalikan (tanpa salinan), jadi pemanggil tidak boleh mengubahnya in-place.
+        Dengan saturasi, kernel Numba (jika ada) mengerjakan semuanya tanpa buffer antara; scratch hanya
+        dipakai jalur cv2 (tanpa Numba) untuk menyimpan hasil brightness/contrast antar panggilan.
         """
         if cv_image is None:
             return None
 
-        brightness = edits.get('brightness', 0)
-        contrast = edits.get('contrast', 1.0)
-        saturation = edits.get('saturation', 1.0)
-
         if brightness == 0 and contrast == 1.0 and saturation == 1.0:
-            return cv_image.copy()
-
-        img_float = cv_image.astype(np.float32)
-        img_float = img_float * contrast + brightness
-        img_float = np.clip(img_float, 0, 255)
-        img_after_br_co = img_float.astype(np.uint8)
+            return cv_image
+
+        # Brightness/contrast cukup satu kali lookup per byte (uint8), tanpa buffer float32.
+        # cv2.convertScaleAbs tidak dipakai di sini karena nilai negatif akan di-abs, bukan di-clip ke 0.
+        bc_key = (int(brightness), int(round(contrast * 100)))
+        bc_lut = get_brightness_contrast_lut(*bc_key)
+        if saturation != 1.0 and _apply_edits_kernel is not None:
+            # Numba: semua tahap dalam satu lintasan paralel, tanpa buffer antara
+            src = np.ascontiguousarray(cv_image)
+            img_final = np.empty_like(src)
+            _apply_edits_kernel(src, bc_lut.ravel(), np.float32(saturation), img_final)
+            return img_final
+
+        # Jika hanya saturasi yang berubah, tahap ini dilewati dan cv2.transform membaca gambar asli langsung
+        if brightness == 0 and contrast == 1.0:
+            img_after_br_co = cv_image
+        elif saturation != 1.0 and scratch is not None and scratch.get('bc_key') == bc_key and scratch.get('bc_src') is cv_image:
+            img_after_br_co = scratch['bc'] # Drag slider saturasi: hasil brightness/contrast sebelumnya masih berlaku
+        else:
+            # Hanya jadi buffer antara jika masih ada tahap saturasi; jika tidak, ini hasil akhirnya
+            img_after_br_co = cv2.LUT(cv_image, bc_lut, dst=get_scratch_buffer(scratch, 'bc', cv_image.shape) if saturation != 1.0 else None)
+            if saturation != 1.0 and scratch is not None: scratch['bc_key'], scratch['bc_src'] = bc_key, cv_image
 
         if saturation == 1.0:
             return img_after_br_co
 
-        hsv = cv2.cvtColor(img_after_br_co, cv2.COLOR_BGR2HSV)
-        hsv_float = hsv.astype(np.float32)
-        h, s, v = cv2.split(hsv_float)
+        # Saturasi langsung di BGR: campuran linear dengan luma dalam satu cv2.transform (hasil di-saturate ke uint8)
+        return cv2.transform(img_after_br_co, get_saturation_matrix(int(round(saturation * 100))))
 
-        s = s * saturation
-        s = np.clip(s, 0, 255)
 
-        final_hsv = cv2.merge((h, s, v))
-        final_hsv_uint8 = final_hsv.astype(np.uint8)
-        img_final = cv2.cvtColor(final_hsv_uint8, cv2.COLOR_HSV2BGR)
-        return img_final
+    def _schedule_image_edits(self, _value=None):
+        """Dipanggil saat slider diubah; nilai langsung dicatat, preview dirender setelah slider berhenti sejenak."""
+        self._read_edit_sliders()
+        self._edits_debounce.start()
+        self._edits_settle.start()
 
-    def update_image_edits(self):
-        """Dipanggil saat slider diubah, menerapkan preview editan."""
+    def _read_edit_sliders(self):
+        self.edit_brightness = self.brightness_slider.value()
+        self.edit_contrast = self.contrast_slider.value() / 100.0
+        self.edit_saturation = self.saturation_slider.value() / 100.0
+
+    def _render_image_edits(self, preview=False):
+        """Menjalankan apply_image_edits di _edit_pool; hanya hasil generasi terbaru yang ditampilkan.
+        preview=True memproses gambar yang sudah diperkecil ke ukuran tampilan (zoom saat ini)."""
+        self._edits_debounce.stop()
+        if not preview: self._edits_settle.stop()
         if self.original_cv_image is None: return
+        preview_size = None
+        if preview:
+            h, w = self.original_cv_image.shape[:2]
+            scale = self.zoom_slider.value() / 100.0
+            if scale < 1.0: preview_size = (max(1, round(w * scale)), max(1, round(h * scale))) # Sama dengan pembulatan QSize di update_zoom
+        self._edit_gen += 1
+        self._edit_pool.clear() # Buang preview lama yang belum sempat jalan
+        task = BackgroundTask(self._build_edit_preview, self.original_cv_image, (self.edit_brightness, self.edit_contrast, self.edit_saturation), self._edit_gen, self.current_image_path, preview_size)
+        task.signals.finished.connect(self._on_edit_preview_ready)
+        task.signals.error.connect(lambda msg: self.status_label.setText(f"Preview failed: {msg}"))
+        self._edit_pool.start(task)
+
+    def _build_edit_preview(self, cv_image, edits, gen, path, preview_size):
+        # Berjalan di thread pool: hanya numpy/cv2 dan QImage (QPixmap harus dibuat di GUI thread)
+        brightness, contrast, saturation = edits
+        cache_key = (int(brightness), int(round(contrast * 100)), int(round(saturation * 100)), preview_size)
+        cache = self._edit_result_cache
+        cached = cache.get(cache_key)
+        if cached is not None and cached[0] is cv_image: # Kombinasi slider yang sama untuk gambar yang sama
+            cache.move_to_end(cache_key)
+            return gen, path, preview_size, cached[1], bgr_to_qimage(cached[1])
+        if preview_size is None:
+            edited_image = self.apply_image_edits(cv_image, *edits, scratch=self._scratch)
+        else:
+            # Versi kecil di-resize sekali per (gambar, ukuran) lalu dipakai ulang selama drag
+            source = self._preview_source
+            if source[0] is not cv_image or source[1] != preview_size:
+                source = self._preview_source = (cv_image, preview_size, cv2.resize(cv_image, preview_size, interpolation=cv2.INTER_AREA))
+            edited_image = self.apply_image_edits(source[2], *edits, scratch=self._preview_scratch)
+        cache[cache_key] = (cv_image, edited_image)
+        total_bytes = sum(entry[1].nbytes for entry in cache.values())
+        while len(cache) > 1 and total_bytes > EDIT_RESULT_CACHE_MAX_BYTES:
+            _, (_, evicted) = cache.popitem(last=False)
+            total_bytes -= evicted.nbytes
+        qt_image = bgr_to_qimage(edited_image)
+        return gen, path, preview_size, edited_image, qt_image # edited_image ikut dikirim agar buffer QImage tetap hidup
+
+    def _on_edit_preview_ready(self, result):
+        gen, path, preview_size, edited_image, qt_image = result
+        if gen != self._edit_gen or path != self.current_image_path or self.original_cv_image is None: return
+        if preview_size is not None:
+            self.viewer_label.setPixmap(QPixmap.fromImage(qt_image)) # Sementara; current_viewer_pixmap diganti saat render penuh
+            return
+        pixmap = QPixmap.fromImage(qt_image)
+        if gen == self._saved_edits_gen: self.original_pixmap_for_editing = pixmap.copy() # Sama seperti render sinkron dulu
+        self._set_viewer_pixmap(pixmap, edited_image)
+        self.update_zoom(self.zoom_slider.value())
 
-        self.current_edits['brightness'] = self.brightness_slider.value()
-        self.current_edits['contrast'] = self.contrast_slider.value() / 100.0
-        self.current_edits['saturation'] = self.saturation_slider.value() / 100.0
-    
-        self.show_image_view(self.current_image_path, reload_from_disk=False)
+    def update_image_edits(self):
+        """Membaca nilai slider dan menerapkan preview editan."""
+        if self.original_cv_image is None: return
+        self._read_edit_sliders()
+        self._render_image_edits()
 
     def reset_image_edits(self):
         """Mereset slider dan gambar ke kondisi semula."""
@@ -1665,16 +2618,20 @@ class MacanGallery(QMainWindow):
         
         meta = read_metadata(self.current_image_path)
         if 'edits' in meta:
-            del meta['edits']
-            write_metadata(self.current_image_path, meta)
+            self._queue_metadata_write(self.current_image_path, {'edits': None})
             self.status_label.setText("Adjustments have been reset.")
         
         self.update_image_edits()
 
+    def _queue_metadata_write(self, image_path, data):
+        """Mencatat update metadata; semua update ditulis sekaligus setelah 250 ms tanpa update baru."""
+        queue_metadata_write(image_path, data)
+        self._metadata_flush_timer.start()
+
     def save_metadata_edits(self):
         """Menyimpan nilai edit saat ini ke file metadata .json."""
         if not self.current_image_path: return
-        write_metadata(self.current_image_path, {'edits': self.current_edits})
+        self._queue_metadata_write(self.current_image_path, {'edits': {'brightness': self.edit_brightness, 'contrast': self.edit_contrast, 'saturation': self.edit_saturation}})
         self.status_label.setText(f"Adjustments saved for {os.path.basename(self.current_image_path)}")
 
     def add_tag(self):
@@ -1685,7 +2642,7 @@ class MacanGallery(QMainWindow):
         metadata = read_metadata(self.current_image_path)
         tags = set(metadata.get('tags', []))
         tags.add(tag_text)
-        write_metadata(self.current_image_path, {'tags': sorted(list(tags))})
+        self._queue_metadata_write(self.current_image_path, {'tags': sorted(list(tags))})
     
         self.tag_input.clear()
         self.update_tag_display()
@@ -1697,43 +2654,46 @@ class MacanGallery(QMainWindow):
         tags = metadata.get('tags', [])
         if tag_to_remove in tags:
             tags.remove(tag_to_remove)
-            write_metadata(self.current_image_path, {'tags': tags})
+            self._queue_metadata_write(self.current_image_path, {'tags': tags})
             self.update_tag_display()
 
     def update_tag_display(self):
-        """Memperbarui tampilan tag di panel info."""
-        while self.tag_display_layout.count():
-            child = self.tag_display_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-    
-        if not self.current_image_path: 
-            self.tag_display_layout.addStretch()
-            return
-    
-        metadata = read_metadata(self.current_image_path)
-        tags = metadata.get('tags', [])
-    
-        for tag in tags:
-            tag_widget = QFrame()
-            # [PERUBAHAN] Warna diubah
-            tag_widget.setStyleSheet("QFrame { background-color: #444444; border-radius: 4px; }")
-            tag_layout = QHBoxLayout(tag_widget)
-            tag_layout.setContentsMargins(5, 2, 2, 2)
-            tag_layout.setSpacing(5)
-        
-            label = QLabel(tag)
-            remove_btn = QPushButton("x")
-            # [PERUBAHAN] Ukuran dan warna diubah
-            remove_btn.setFixedSize(18, 18)
-            remove_btn.setStyleSheet("background-color: #D16969; border-radius: 9px; font-weight: bold; color: #FFFFFF;")
-            remove_btn.clicked.connect(partial(self.remove_tag, tag))
-        
-            tag_layout.addWidget(label)
-            tag_layout.addWidget(remove_btn)
-            self.tag_display_layout.addWidget(tag_widget)
-        
-        self.tag_display_layout.addStretch()
+        """Memperbarui tampilan tag di panel info. Hanya widget tag yang berubah yang dibuat/dihapus."""
+        tags = read_metadata(self.current_image_path).get('tags', []) if self.current_image_path else []
+        wanted = set(tags)
+        for tag in [t for t in self._tag_widgets if t not in wanted]:
+            tag_widget = self._tag_widgets.pop(tag)
+            self.tag_display_layout.removeWidget(tag_widget)
+            tag_widget.deleteLater()
+
+        for index, tag in enumerate(tags):
+            tag_widget = self._tag_widgets.get(tag)
+            if tag_widget is None:
+                tag_widget = self._tag_widgets[tag] = self._build_tag_widget(tag)
+            elif self.tag_display_layout.indexOf(tag_widget) == index:
+                continue
+            else:
+                self.tag_display_layout.removeWidget(tag_widget)
+            self.tag_display_layout.insertWidget(index, tag_widget)
+
+    def _build_tag_widget(self, tag):
+        tag_widget = QFrame()
+        # [PERUBAHAN] Warna diubah
+        tag_widget.setStyleSheet("QFrame { background-color: #444444; border-radius: 4px; }")
+        tag_layout = QHBoxLayout(tag_widget)
+        tag_layout.setContentsMargins(5, 2, 2, 2)
+        tag_layout.setSpacing(5)
+
+        label = QLabel(tag)
+        remove_btn = QPushButton("x")
+        # [PERUBAHAN] Ukuran dan warna diubah
+        remove_btn.setFixedSize(18, 18)
+        remove_btn.setStyleSheet("background-color: #D16969; border-radius: 9px; font-weight: bold; color: #FFFFFF;")
+        remove_btn.clicked.connect(partial(self.remove_tag, tag))
+
+        tag_layout.addWidget(label)
+        tag_layout.addWidget(remove_btn)
+        return tag_widget
     
     def load_settings(self):
         geometry = self.settings.value("geometry", QByteArray())
@@ -1741,15 +2701,32 @@ class MacanGallery(QMainWindow):
         else: self.setGeometry(100, 100, 1200, 800)
             
     def save_settings(self):
+        # sort_method/filter_method sudah disimpan saat diubah; QSettings menulis ke disk sekali saat sync()
         self.settings.setValue("geometry", self.saveGeometry())
-        self.settings.setValue("sort_method", self.current_sort_method)
         
+    def _flush_metadata_writes(self):
+        failures = flush_metadata_writes()
+        if failures: self.status_label.setText(f"Warning: {describe_metadata_failures(failures)}")
+
     def closeEvent(self, event):
+        self._metadata_flush_timer.stop(), self._flush_metadata_writes()
+        self.save_settings(), self.settings.sync() # Simpan dulu, sebelum menunggu worker
         if self.thumbnail_thread and self.thumbnail_thread.isRunning():
             self.thumbnail_worker.stop()
             self.thumbnail_thread.quit()
-            self.thumbnail_thread.wait()
-        self.save_settings(), event.accept()
+            # Jangan memblokir di sini: jendela disembunyikan dan aplikasi keluar saat thread selesai. QThread yang
+            # dihancurkan saat masih jalan membuat Qt abort, jadi jika worker tidak berhenti dalam CLOSE_WAIT_TIMEOUT_MS
+            # proses diakhiri langsung (thumbnail ditulis atomik, settings dan metadata sudah tersimpan di atas).
+            self.thumbnail_thread.finished.connect(self._quit_after_worker)
+            if not self.thumbnail_thread.isRunning(): # Selesai sebelum signal sempat tersambung
+                event.accept(); return
+            QTimer.singleShot(CLOSE_WAIT_TIMEOUT_MS, lambda: os._exit(0))
+            self.hide(), event.ignore()
+            return
+        event.accept()
+
+    def _quit_after_worker(self):
+        QApplication.instance().quit()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)